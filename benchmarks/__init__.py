@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
@@ -0,0 +1,138 @@
+"""Офлайн-корпус страниц docs.python.org и peps.python.org.
+
+Страницы лежат в benchmarks/corpus и раздаются через requests_mock:
+страницы версий и PEP собираются из шаблонов, архив с документацией
+генерируется в памяти.
+"""
+import re
+from hashlib import sha256
+from pathlib import Path
+from string import Template
+
+import requests_mock
+
+CORPUS_DIR = Path(__file__).resolve().parent / 'corpus'
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+PEP_BASE_URL = 'https://peps.python.org/'
+ARCHIVE_URL = MAIN_DOC_URL + 'archives/python-3.13-docs-pdf-a4.zip'
+ARCHIVE_SIZE = 8 * 1024 * 1024
+LAST_MODIFIED = 'Fri, 18 Oct 2024 06:17:00 GMT'
+
+EDITORS = {
+    '3.13': 'Adam Turner and Thomas Wouters',
+    '3.12': 'Adam Turner',
+    '3.11': 'Pablo Galindo Salgado',
+    '3.10': 'Pablo Galindo Salgado',
+    '3.9': 'Łukasz Langa',
+    '3.8': 'Raymond Hettinger',
+}
+# Страницы, статус в карточке которых расходится со строкой индекса.
+PAGE_STATUSES = {401: 'April Fool!'}
+
+INDEX_ROW = re.compile(
+    r'<abbr title="(?P<type>[^",]+), (?P<status>[^"]+)">\w*</abbr></td>\s*'
+    r'<td class="num"><a class="pep reference internal" '
+    r'href="pep-(?P<number>\d+)/"'
+)
+
+
+def read_page(*parts):
+    return (CORPUS_DIR.joinpath(*parts)).read_text(encoding='utf-8')
+
+
+def pep_rows():
+    """Строки индекса PEP: (номер, тип, статус на странице)."""
+    return [
+        (
+            int(match['number']),
+            match['type'],
+            PAGE_STATUSES.get(int(match['number']), match['status'])
+        )
+        for match in INDEX_ROW.finditer(read_page('peps', 'index.html'))
+    ]
+
+
+def archive_content():
+    return bytes(range(256)) * (ARCHIVE_SIZE // 256)
+
+
+def page_headers(text, content_type='text/html; charset=utf-8'):
+    return {
+        'Content-Type': content_type,
+        'ETag': '"{}"'.format(sha256(text.encode()).hexdigest()[:16]),
+        'Last-Modified': LAST_MODIFIED,
+    }
+
+
+def register_page(adapter, url, text,
+                  content_type='text/html; charset=utf-8'):
+    adapter.register_uri(
+        'GET', url, text=text, headers=page_headers(text, content_type)
+    )
+
+
+def register_archive(adapter, content):
+    headers = {'ETag': '"archive"', 'Content-Length': str(len(content))}
+
+    def archive(request, context):
+        if request.headers.get('If-Range') == headers['ETag']:
+            context.status_code = 206
+            return content[int(request.headers['Range'][6:-1]):]
+        context.headers.update(headers)
+        return content
+
+    adapter.register_uri('HEAD', ARCHIVE_URL, headers=headers)
+    adapter.register_uri('GET', ARCHIVE_URL, content=archive)
+
+
+def build_adapter():
+    adapter = requests_mock.Adapter()
+    register_page(adapter, MAIN_DOC_URL, read_page('docs', 'index.html'))
+    register_page(
+        adapter, MAIN_DOC_URL + 'download.html',
+        read_page('docs', 'download.html')
+    )
+    register_page(
+        adapter, MAIN_DOC_URL + 'whatsnew/',
+        read_page('docs', 'whatsnew', 'index.html')
+    )
+    version_page = Template(read_page('docs', 'whatsnew', 'version.html'))
+    for version in re.findall(
+            r'class="toctree-l1"><a class="reference internal" '
+            r'href="([\d.]+)\.html"',
+            read_page('docs', 'whatsnew', 'index.html')
+    ):
+        register_page(
+            adapter, f'{MAIN_DOC_URL}whatsnew/{version}.html',
+            version_page.substitute(
+                version=version,
+                anchor=version.replace('.', '-'),
+                editor=EDITORS.get(version, 'Guido van Rossum'),
+            )
+        )
+    register_page(adapter, PEP_BASE_URL, read_page('peps', 'index.html'))
+    register_page(
+        adapter, PEP_BASE_URL + 'api/peps.json',
+        read_page('peps', 'api', 'peps.json'),
+        content_type='application/json'
+    )
+    pep_page = Template(read_page('peps', 'pep.html'))
+    for number, pep_type, status in pep_rows():
+        register_page(
+            adapter, f'{PEP_BASE_URL}pep-{number:04d}/',
+            pep_page.substitute(
+                number=number,
+                padded=f'{number:04d}',
+                title=f'PEP {number}',
+                authors='Guido van Rossum, Barry Warsaw',
+                status=status,
+                type=pep_type,
+            )
+        )
+    register_archive(adapter, archive_content())
+    return adapter
+
+
+def mount_corpus(session, adapter=None):
+    session.mount('https://', adapter or build_adapter())
+    return session
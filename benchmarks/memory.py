@@ -0,0 +1,182 @@
+"""Бенчмарк пиковой памяти режима pep на синтетическом индексе.
+
+Для каждого числа PEP из --counts обход запускается в отдельном
+процессе: страницы PEP генерируются на лету из шаблона корпуса и
+дополняются --padding байтами текста, HTTP-кеш не используется.
+Меряется прирост пикового RSS (ru_maxrss) за обход относительно
+разогрева; он не должен превышать --ceiling мегабайт ни для одного
+числа PEP, иначе код возврата 1.
+
+    python -m benchmarks.memory --counts 100 3000 --ceiling 16
+"""
+import argparse
+import json
+import logging
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from string import Template
+
+import requests
+from requests import Response
+from requests.adapters import BaseAdapter
+
+import main
+from benchmarks.corpus import PEP_BASE_URL, read_page
+from constants import PAGES_SOURCE
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+WARMUP_COUNT = 20
+CEILING_MB = 16
+INDEX_ROW = Template(
+    '<tr><td><abbr title="Standards Track, Final">SF</abbr></td>\n'
+    '<td class="num"><a class="pep reference internal"'
+    ' href="pep-$padded/">$number</a></td></tr>\n'
+)
+PEP_PAGE_URL = re.compile(re.escape(PEP_BASE_URL) + r'pep-(\d+)/$')
+REPORT_TEXT = ('PEP: {count}, пик RSS: {peak_mb:.1f} МБ,'
+               ' прирост за обход: {growth_mb:.1f} МБ')
+CEILING_TEXT = 'Прирост памяти {growth_mb:.1f} МБ превышает {ceiling} МБ'
+
+
+def index_page(count):
+    rows = ''.join(
+        INDEX_ROW.substitute(number=number, padded=f'{number:04d}')
+        for number in range(1, count + 1)
+    )
+    return (
+        '<section id="index-by-category">'
+        '<table class="pep-zero-table"><tbody>'
+        f'{rows}</tbody></table></section>'
+    )
+
+
+class SyntheticAdapter(BaseAdapter):
+    """Отдаёт индекс из count PEP и генерирует их страницы по запросу.
+
+    В отличие от requests_mock не хранит историю запросов, так что
+    память самого адаптера не растёт с числом PEP.
+    """
+
+    def __init__(self, count, padding):
+        super().__init__()
+        self.index = index_page(count).encode()
+        self.pep_page = Template(read_page('peps', 'pep.html'))
+        self.filler = '<p>{}</p>'.format('PEP text. ' * (padding // 10))
+
+    def page(self, number):
+        return self.pep_page.substitute(
+            number=number,
+            padded=f'{number:04d}',
+            title=f'PEP {number}',
+            authors='Guido van Rossum',
+            status='Final',
+            type='Standards Track',
+        ).replace('</article>', self.filler + '</article>', 1).encode()
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        matched = PEP_PAGE_URL.match(request.url)
+        if request.url == PEP_BASE_URL:
+            response.status_code, response._content = 200, self.index
+        elif matched:
+            response.status_code = 200
+            response._content = self.page(int(matched[1]))
+        else:
+            response.status_code, response._content = 404, b''
+        return response
+
+    def close(self):
+        pass
+
+
+def crawl(count, padding, workers, tmp_dir):
+    session = requests.Session()
+    session.mount('https://', SyntheticAdapter(count, padding))
+    cli_args = argparse.Namespace(
+        pep_source=PAGES_SOURCE, workers=workers,
+        parse_workers=0, incremental=False
+    )
+    main.MEMO_FILE = Path(tmp_dir) / f'memo_{count}.sqlite'
+    main.PEP_INDEX_FILE = Path(tmp_dir) / f'pep_index_{count}.json'
+    main.JOURNAL_DIR = Path(tmp_dir) / 'journal'
+    return list(main.iter_pep(session, cli_args))
+
+
+def max_rss_mb():
+    # В Linux ru_maxrss в килобайтах.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(count, padding, workers):
+    """Пиковый RSS одного обхода; запускается в отдельном процессе."""
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        crawl(WARMUP_COUNT, padding, workers, tmp_dir)
+        baseline = max_rss_mb()
+        rows = crawl(count, padding, workers, tmp_dir)
+    peak = max_rss_mb()
+    return {
+        'count': count,
+        'total': rows[-1][1],
+        'peak_mb': peak,
+        'growth_mb': peak - baseline,
+    }
+
+
+def run_child(count, args):
+    completed = subprocess.run(
+        (
+            sys.executable, '-m', 'benchmarks.memory', '--child', str(count),
+            '--padding', str(args.padding), '--workers', str(args.workers),
+        ),
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк пиковой памяти режима pep'
+    )
+    parser.add_argument(
+        '-n', '--counts', type=int, nargs='+', default=(100, 1000)
+    )
+    parser.add_argument(
+        '--padding', type=int, default=256 * 1024,
+        help='Размер текста, добавляемого к каждой странице PEP, байты'
+    )
+    parser.add_argument('-w', '--workers', type=int, default=main.WORKERS)
+    parser.add_argument(
+        '--ceiling', type=float, default=CEILING_MB,
+        help='Допустимый прирост пикового RSS за обход, МБ'
+    )
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    return parser
+
+
+def main_benchmark():
+    args = configure_argument_parser().parse_args()
+    if args.child is not None:
+        print(json.dumps(measure(args.child, args.padding, args.workers)))
+        return
+    exceeded = False
+    for count in args.counts:
+        result = run_child(count, args)
+        print(REPORT_TEXT.format(**result))
+        if result['growth_mb'] > args.ceiling:
+            print(CEILING_TEXT.format(ceiling=args.ceiling, **result))
+            exceeded = True
+    if exceeded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main_benchmark()
@@ -0,0 +1,223 @@
+"""Офлайн-бенчмарк режимов парсера на корпусе из benchmarks/corpus.
+
+Для каждого режима меряется полный прогон на холодном и тёплом кеше
+(тёплыми при этом оказываются и HTTP-кеш, и сохранённые результаты
+извлечения) и отдельно стоимость фаз: загрузки (fetch), разбора (parse)
+и извлечения данных (extract). Результат пишется в JSON; с --compare печатается
+отношение к сохранённому прогону другого коммита.
+
+    python -m benchmarks.run --repeat 5 --output bench_output.json
+    python -m benchmarks.run --mode pep --compare bench_baseline.json
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+
+from requests_cache import CachedSession
+
+import main
+from constants import API_SOURCE, PAGES_SOURCE
+from benchmarks.corpus import (ARCHIVE_URL, MAIN_DOC_URL, PEP_BASE_URL,
+                               build_adapter, mount_corpus)
+from extractors import (VERSION_INFO_TARGET, extract_version_info,
+                        extract_versions, pep_status)
+from profiling import summarize
+from utils import download_file, get_response, make_soup
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MODES = ('whats-new', 'latest-versions', 'pep', 'download')
+REGRESSION_TEXT = '{metric}: {old:.4f} -> {new:.4f} (x{ratio:.2f})'
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def new_session(adapter):
+    return mount_corpus(CachedSession(backend='memory'), adapter)
+
+
+def run_mode(session, mode, cli_args):
+    results = main.MODE_TO_ROWS[mode](session, cli_args)
+    if results is not None:
+        list(results)
+
+
+def version_links(session):
+    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
+    soup = make_soup(get_response(session, whats_new_url).text)
+    return [
+        urljoin(whats_new_url, a_tag['href'])
+        for a_tag in soup.select(
+            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
+        )
+    ]
+
+
+def pep_links(session):
+    soup = make_soup(get_response(session, PEP_BASE_URL).text)
+    return [
+        urljoin(PEP_BASE_URL, tr.a['href'])
+        for table in soup.select('#index-by-category table.pep-zero-table')
+        for tr in table.tbody.find_all('tr')
+    ]
+
+
+# Режим -> (список URL, разбор ответа, извлечение данных из разобранного).
+PAGES = {
+    'whats-new': (
+        version_links,
+        lambda response: make_soup(
+            response.text, parse_only=VERSION_INFO_TARGET
+        ),
+        extract_version_info,
+    ),
+    'latest-versions': (
+        lambda session: [MAIN_DOC_URL],
+        lambda response: make_soup(response.text),
+        lambda soup: list(extract_versions(soup)),
+    ),
+    'pep': (
+        pep_links,
+        lambda response: response.content,
+        pep_status,
+    ),
+}
+
+
+def measure_phases(adapter, mode):
+    session = new_session(adapter)
+    if mode == 'download':
+        seconds = []
+        for _ in range(3):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                seconds.append(timed(
+                    download_file, session, ARCHIVE_URL,
+                    Path(tmp_dir) / 'docs.zip'
+                )[0])
+        return {'fetch': summarize(seconds)}
+    get_links, parse, extract = PAGES[mode]
+    phases = {'fetch': [], 'parse': [], 'extract': []}
+    for link in get_links(session):
+        seconds, response = timed(get_response, session, link)
+        phases['fetch'].append(seconds)
+        seconds, parsed = timed(parse, response)
+        phases['parse'].append(seconds)
+        phases['extract'].append(timed(extract, parsed)[0])
+    return {phase: summarize(samples) for phase, samples in phases.items()}
+
+
+def measure_mode(adapter, mode, tmp_dir, args):
+    cli_args = argparse.Namespace(
+        workers=args.workers, parse_workers=args.parse_workers,
+        incremental=False, pep_source=args.pep_source
+    )
+    cold, warm = [], []
+    for run in range(args.repeat):
+        main.MEMO_FILE = Path(tmp_dir) / f'{mode}_{run}_memo.sqlite'
+        session = new_session(adapter)
+        cold.append(timed(run_mode, session, mode, cli_args)[0])
+        warm.append(timed(run_mode, session, mode, cli_args)[0])
+    return {
+        'cold': summarize(cold),
+        'warm': summarize(warm),
+        'phases': measure_phases(adapter, mode),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'), cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(report):
+    metrics = {}
+    for mode, result in report['modes'].items():
+        for run in ('cold', 'warm'):
+            metrics[f'{mode}.{run}.p50_ms'] = result[run]['p50_ms']
+        for phase, summary in result['phases'].items():
+            metrics[f'{mode}.{phase}.total_s'] = summary['total_s']
+    return metrics
+
+
+def compare(report, baseline_path, threshold):
+    baseline = flatten(json.loads(Path(baseline_path).read_text()))
+    regressions = 0
+    for metric, new in flatten(report).items():
+        old = baseline.get(metric)
+        if not old:
+            continue
+        ratio = new / old
+        print(REGRESSION_TEXT.format(
+            metric=metric, old=old, new=new, ratio=ratio
+        ))
+        regressions += ratio > threshold
+    return regressions
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(description='Бенчмарк режимов парсера')
+    parser.add_argument(
+        '-m', '--mode', action='append', dest='modes', choices=MODES
+    )
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-w', '--workers', type=int, default=main.WORKERS)
+    parser.add_argument(
+        '-p', '--parse-workers', type=int, default=main.PARSE_WORKERS
+    )
+    parser.add_argument(
+        '--pep-source', choices=(API_SOURCE, PAGES_SOURCE), default=API_SOURCE
+    )
+    parser.add_argument('-o', '--output', default='bench_output.json')
+    parser.add_argument('--compare', help='JSON прошлого прогона')
+    parser.add_argument(
+        '--threshold', type=float, default=1.2,
+        help='Допустимое замедление относительно --compare'
+    )
+    return parser
+
+
+def main_benchmark():
+    args = configure_argument_parser().parse_args()
+    logging.disable(logging.CRITICAL)
+    adapter = build_adapter()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        main.BASE_DIR = Path(tmp_dir)
+        main.PEP_INDEX_FILE = Path(tmp_dir) / 'pep_index.json'
+        report = {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'repeat': args.repeat,
+            'workers': args.workers,
+            'parse_workers': args.parse_workers,
+            'pep_source': args.pep_source,
+            'modes': {
+                mode: measure_mode(adapter, mode, tmp_dir, args)
+                for mode in args.modes or MODES
+            },
+        }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(json.dumps(flatten(report), indent=2))
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main_benchmark()
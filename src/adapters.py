@@ -0,0 +1,110 @@
+import logging
+from collections import Counter
+from threading import Lock, local
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from constants import BACKOFF_FACTOR, RETRY_STATUSES, THROTTLE_STATUSES
+from ratelimit import RateController
+
+HTTP_STATS_TEXT = ('Статистика HTTP: повторов {retries},'
+                   ' таймаутов {timeouts}, троттлингов {throttled},'
+                   ' ответов с ошибкой {statuses}')
+
+http_stats = Counter()
+http_stats_lock = Lock()
+# Был ли в текущем запросе потока ответ 429/503, ушедший на повтор.
+retry_state = local()
+
+
+def count(event):
+    with http_stats_lock:
+        http_stats[event] += 1
+
+
+def log_http_stats():
+    statuses = {
+        event: number for event, number in sorted(http_stats.items())
+        if isinstance(event, int)
+    }
+    logging.info(HTTP_STATS_TEXT.format(
+        retries=http_stats['retries'],
+        timeouts=http_stats['timeouts'],
+        throttled=http_stats['throttled'],
+        statuses=statuses or '—',
+    ))
+
+
+class CountingRetry(Retry):
+    """Retry, который считает повторы и таймауты в http_stats.
+
+    urllib3 вызывает increment и на последней попытке, перед
+    MaxRetryError, поэтому повтор засчитывается, только если
+    super().increment() его разрешил.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  *args, **kwargs):
+        if isinstance(error, (ConnectTimeoutError, ReadTimeoutError)):
+            count('timeouts')
+        if response is not None:
+            count(response.status)
+        retry = super().increment(
+            method, url, response, error, *args, **kwargs
+        )
+        count('retries')
+        if response is not None and response.status in THROTTLE_STATUSES:
+            retry_state.throttled = True
+        return retry
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter с таймаутом по умолчанию для каждого запроса.
+
+    Если задан rate_controller, каждый уходящий в сеть запрос проходит
+    через ограничитель своего хоста (ответы из кеша сюда не доходят).
+    """
+
+    def __init__(self, timeout, *args, rate_controller=None, **kwargs):
+        self.timeout = timeout
+        self.rate_controller = rate_controller
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        timeout = timeout or self.timeout
+        if self.rate_controller is None:
+            return super().send(request, timeout=timeout, **kwargs)
+        limiter = self.rate_controller.limiter(urlsplit(request.url).netloc)
+        retry_state.throttled = False
+        throttled = True
+        started = limiter.acquire()
+        try:
+            response = super().send(request, timeout=timeout, **kwargs)
+            throttled = (
+                retry_state.throttled
+                or response.status_code in THROTTLE_STATUSES
+            )
+            return response
+        finally:
+            if throttled:
+                count('throttled')
+            limiter.release(started, throttled)
+
+
+def build_adapter(pool_size, timeout, retries, max_rps=None):
+    return TimeoutHTTPAdapter(
+        timeout,
+        rate_controller=RateController(pool_size, max_rps),
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=CountingRetry(
+            total=retries,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(('GET', 'HEAD')),
+            respect_retry_after_header=True,
+        ),
+    )
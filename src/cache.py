@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from threading import Lock
+
+from constants import (CACHE_ACCESS_FILE, CACHE_NAME, FILESYSTEM_BACKEND,
+                       MEMORY_BACKEND, SQLITE_BACKEND)
+
+CACHE_EVICTED = 'Из кеша удалено записей: {count}, освобождено {size} байт'
+STATS_HEADER = ('Показатель', 'Значение')
+
+
+def sqlite_backend():
+    from requests_cache import SQLiteCache
+
+    return SQLiteCache(CACHE_NAME, wal=True)
+
+
+def filesystem_backend():
+    from requests_cache import FileCache
+
+    return FileCache(CACHE_NAME)
+
+
+CACHE_BACKENDS = {
+    SQLITE_BACKEND: sqlite_backend,
+    FILESYSTEM_BACKEND: filesystem_backend,
+    MEMORY_BACKEND: lambda: MEMORY_BACKEND,
+}
+
+
+def access_path(backend):
+    if backend == MEMORY_BACKEND:
+        return None
+    return Path(CACHE_ACCESS_FILE)
+
+
+class CacheTracker:
+    """Время обращения и размер записей кеша для вытеснения по LRU.
+
+    Обращения записываются хуком ответа сессии, а вместе с ними
+    накапливаются попадания и промахи для --cache-stats.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = Lock()
+        data = {}
+        if path is not None and path.exists():
+            data = json.loads(path.read_text(encoding='utf-8'))
+        self.entries = data.get('entries', {})
+        self.hits = data.get('hits', 0)
+        self.misses = data.get('misses', 0)
+
+    def on_response(self, response, *args, **kwargs):
+        cache_key = getattr(response, 'cache_key', None)
+        if cache_key is None:
+            return response
+        with self.lock:
+            if response.from_cache:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.entries[cache_key] = [
+                time.time(), getattr(response, 'size', None)
+            ]
+        return response
+
+    def sync(self, cache):
+        """Сверяет записи с содержимым кеша и дописывает размеры."""
+        keys = set(cache.responses.keys())
+        with self.lock:
+            for cache_key in list(self.entries):
+                if cache_key not in keys:
+                    del self.entries[cache_key]
+            for cache_key in keys:
+                accessed, size = self.entries.get(cache_key, (0, None))
+                if size is None:
+                    response = cache.get_response(cache_key)
+                    size = response.size if response is not None else 0
+                self.entries[cache_key] = [accessed, size]
+
+    def total_size(self):
+        return sum(size for _, size in self.entries.values())
+
+    def evict(self, cache, max_size):
+        self.sync(cache)
+        total = self.total_size()
+        evicted = []
+        for cache_key, (_, size) in sorted(
+                self.entries.items(), key=lambda item: item[1][0]
+        ):
+            if total <= max_size:
+                break
+            evicted.append(cache_key)
+            total -= size
+        if not evicted:
+            return evicted
+        freed = self.total_size() - total
+        cache.delete(*evicted)
+        vacuum = getattr(cache.responses, 'vacuum', None)
+        if vacuum is not None:
+            vacuum()
+        with self.lock:
+            for cache_key in evicted:
+                del self.entries[cache_key]
+        logging.info(CACHE_EVICTED.format(count=len(evicted), size=freed))
+        return evicted
+
+    def maintain(self, cache, max_size=None):
+        if max_size is not None:
+            self.evict(cache, max_size)
+        self.save()
+
+    def stats(self, cache):
+        self.sync(cache)
+        requests = self.hits + self.misses
+        return [
+            STATS_HEADER,
+            ('Записей', len(self.entries)),
+            ('Байт', self.total_size()),
+            ('Попаданий', self.hits),
+            ('Промахов', self.misses),
+            ('Доля попаданий', f'{self.hits / (requests or 1):.1%}'),
+        ]
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with self.lock:
+            tmp_path.write_text(
+                json.dumps({
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': self.entries,
+                }),
+                encoding='utf-8'
+            )
+        os.replace(tmp_path, self.path)
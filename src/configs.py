@@ -1,17 +1,120 @@
 import argparse
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
 
-from constants import FILE_CASE, LOG_DIR, LOG_FILE, PRETTY_CASE
+from cache import CACHE_BACKENDS
+from constants import (API_SOURCE, COLUMN_WIDTH, CONNECT_TIMEOUT,
+                       EXPIRE_AFTER, FILE_CASE, JSON_LOG, JSONL_CASE, LOG_DIR,
+                       LOG_FILE, MAX_RPS, NEVER_EXPIRE, PAGES_SOURCE,
+                       PARSE_WORKERS, POOL_SIZE, PRETTY_CASE, READ_TIMEOUT,
+                       RETRIES, SQLITE_BACKEND, SQLITE_CASE, TEXT_LOG,
+                       URLS_EXPIRE_AFTER, WATCH_INTERVAL, WORKERS)
 
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
+NOT_POSITIVE = 'Ожидалось целое положительное число, получено: {value}'
+NOT_NON_NEGATIVE = 'Ожидалось целое неотрицательное число, получено: {value}'
+NOT_POSITIVE_NUMBER = 'Ожидалось положительное число, получено: {value}'
+BAD_BYTE_SIZE = 'Ожидался размер вида 500K, 200M или 1G, получено: {value}'
+BAD_INTERVAL = 'Ожидался интервал вида РЕЖИМ=СЕКУНДЫ, получено: {value}'
+BAD_EXPIRE_RULE = ('Ожидалось правило вида ШАБЛОН=СЕКУНДЫ, где СЕКУНДЫ >= 0'
+                   ' или -1, получено: {value}')
+BAD_SHARD = 'Ожидалась часть вида i/N, где 1 <= i <= N, получено: {value}'
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(NOT_POSITIVE.format(value=value))
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(NOT_NON_NEGATIVE.format(
+            value=value
+        ))
+    return number
+
+
+def positive_float(value):
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(NOT_POSITIVE_NUMBER.format(
+            value=value
+        ))
+    return number
+
+
+BYTE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def byte_size(value):
+    number, unit = value[:-1], value[-1:].upper()
+    if unit not in BYTE_UNITS:
+        number, unit = value, ''
+    try:
+        size = int(float(number) * BYTE_UNITS[unit])
+    except (ValueError, OverflowError):
+        size = 0
+    if size <= 0:
+        raise argparse.ArgumentTypeError(BAD_BYTE_SIZE.format(value=value))
+    return size
+
+
+def expire_rule(value):
+    pattern, _, seconds = value.rpartition('=')
+    try:
+        seconds = int(seconds)
+    except ValueError:
+        seconds = None
+    if seconds is None or seconds < NEVER_EXPIRE:
+        raise argparse.ArgumentTypeError(BAD_EXPIRE_RULE.format(value=value))
+    return pattern, seconds
+
+
+def shard_spec(value):
+    try:
+        index, count = map(int, value.split('/'))
+    except ValueError:
+        index = count = 0
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(BAD_SHARD.format(value=value))
+    return index, count
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Не сверяет с choices пустой список позиционного nargs='*'.
+
+    До Python 3.12 argparse проверяет такой пустой список целиком и
+    отвергает запуск без режимов (bpo-9625).
+    """
+
+    def _check_value(self, action, value):
+        if value != []:
+            super()._check_value(action, value)
+
+
+def mode_interval(value):
+    mode, _, seconds = value.rpartition('=')
+    try:
+        seconds = int(seconds)
+    except ValueError:
+        seconds = 0
+    if not mode or seconds <= 0:
+        raise argparse.ArgumentTypeError(BAD_INTERVAL.format(value=value))
+    return mode, seconds
 
 
 def configure_argument_parser(available_modes):
-    parser = argparse.ArgumentParser(description='Парсер Python документации')
+    parser = ArgumentParser(description='Парсер Python документации')
     parser.add_argument(
         'mode',
+        nargs='*',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -24,21 +127,243 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(PRETTY_CASE, FILE_CASE),
+        choices=(PRETTY_CASE, FILE_CASE, JSONL_CASE, SQLITE_CASE),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '--column-width',
+        type=positive_int,
+        default=COLUMN_WIDTH,
+        help='Наибольшая ширина столбца в выводе pretty, символы'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=WORKERS,
+        help='Количество потоков для параллельной загрузки страниц'
+    )
+    parser.add_argument(
+        '-p',
+        '--parse-workers',
+        type=non_negative_int,
+        default=PARSE_WORKERS,
+        help=('Количество процессов для разбора страниц'
+              ' (0 — разбирать в потоках загрузки)')
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=tuple(CACHE_BACKENDS),
+        default=SQLITE_BACKEND,
+        help='Хранилище кеша HTTP-ответов'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=byte_size,
+        metavar='SIZE',
+        help=('Предельный размер кеша (например, 200M); при превышении'
+              ' удаляются давно не использованные записи')
+    )
+    parser.add_argument(
+        '--cache-stats',
+        action='store_true',
+        help='Показать число записей, объём и долю попаданий кеша'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        default=POOL_SIZE,
+        help='Размер пула соединений к одному хосту'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=positive_float,
+        default=CONNECT_TIMEOUT,
+        help='Таймаут установки соединения, секунды'
+    )
+    parser.add_argument(
+        '--read-timeout',
+        type=positive_float,
+        default=READ_TIMEOUT,
+        help='Таймаут чтения ответа, секунды'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=RETRIES,
+        help='Число повторов при сбоях сети и ответах 429/5xx'
+    )
+    parser.add_argument(
+        '--max-rps',
+        type=positive_float,
+        default=MAX_RPS,
+        help='Потолок запросов в секунду к одному хосту'
+    )
+    parser.add_argument(
+        '--pep-source',
+        choices=(API_SOURCE, PAGES_SOURCE),
+        default=API_SOURCE,
+        help='Источник статусов PEP: JSON-индекс или страницы PEP'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать заново только изменившиеся PEP'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help=('Продолжить прерванный запуск pep или whats-new по журналу,'
+              ' загружая только оставшиеся URL')
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Замер времени по фазам и URL с отчётом в JSON'
+    )
+    parser.add_argument(
+        '--log-format',
+        choices=(TEXT_LOG, JSON_LOG),
+        default=TEXT_LOG,
+        help='Формат записей лога: текст или JSON по строке на запись'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help=('Не завершаться, а перезапускать режимы через интервал'
+              ' наблюдения и выводить результаты, только если они'
+              ' изменились')
+    )
+    parser.add_argument(
+        '--watch-interval',
+        type=positive_int,
+        default=WATCH_INTERVAL,
+        metavar='SECONDS',
+        help='Интервал наблюдения --watch по умолчанию'
+    )
+    parser.add_argument(
+        '--interval',
+        type=mode_interval,
+        action='append',
+        default=[],
+        metavar='MODE=SECONDS',
+        help='Свой интервал наблюдения для режима'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard_spec,
+        metavar='i/N',
+        help=('Обойти в режиме pep только PEP с номером, дающим остаток'
+              ' i-1 при делении на N, и сохранить часть для --merge')
+    )
+    parser.add_argument(
+        '--merge',
+        action='append',
+        default=[],
+        metavar='SHARD_FILE',
+        help=('Свести файлы частей --shard в итоговую таблицу режима pep;'
+              ' флаг указывается для каждого файла')
+    )
+    parser.add_argument(
+        '--cache-expire',
+        type=expire_rule,
+        action='append',
+        default=[],
+        metavar='PATTERN=SECONDS',
+        help='Срок жизни кеша для URL по шаблону (-1 — бессрочно)'
+    )
     return parser
 
 
-def configure_logging():
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(
+                timespec='milliseconds'
+            ),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ThreadQueueHandler(QueueHandler):
+    """QueueHandler, который не форматирует запись в вызывающем потоке.
+
+    Очередь читает поток QueueListener того же процесса, поэтому
+    запись можно передать как есть, а форматирование оставить ему.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+LOG_FORMATTERS = {
+    TEXT_LOG: lambda: logging.Formatter(LOG_FORMAT, DT_FORMAT),
+    JSON_LOG: JsonFormatter,
+}
+
+
+def configure_logging(log_format=TEXT_LOG):
+    """Направляет логи в файл и stderr через очередь и фоновый поток.
+
+    Вызовы logging в потоках загрузки и разбора только кладут запись
+    в очередь. Возвращает запущенный QueueListener: его stop() дописывает
+    оставшиеся в очереди записи и должен вызываться при завершении.
+    """
     LOG_DIR.mkdir(exist_ok=True)
 
-    rotating_handler = RotatingFileHandler(
-        LOG_FILE, maxBytes=10 ** 6, backupCount=5
+    formatter = LOG_FORMATTERS[log_format]()
+    handlers = (
+        RotatingFileHandler(LOG_FILE, maxBytes=10 ** 6, backupCount=5),
+        logging.StreamHandler(),
     )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = SimpleQueue()
     logging.basicConfig(
-        datefmt=DT_FORMAT,
-        format=LOG_FORMAT,
         level=logging.INFO,
-        handlers=(rotating_handler, logging.StreamHandler())
+        handlers=(ThreadQueueHandler(log_queue),),
+        force=True
+    )
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    return listener
+
+
+def configure_session(cli_args):
+    import requests_cache
+
+    from adapters import build_adapter
+
+    urls_expire_after = dict(getattr(cli_args, 'cache_expire', ()))
+    for pattern, expire_after in URLS_EXPIRE_AFTER.items():
+        urls_expire_after.setdefault(pattern, expire_after)
+    session = requests_cache.CachedSession(
+        backend=CACHE_BACKENDS[
+            getattr(cli_args, 'cache_backend', SQLITE_BACKEND)
+        ](),
+        expire_after=EXPIRE_AFTER,
+        urls_expire_after=urls_expire_after,
+    )
+    adapter = build_adapter(
+        max(
+            getattr(cli_args, 'pool_size', POOL_SIZE),
+            getattr(cli_args, 'workers', WORKERS)
+        ),
+        (
+            getattr(cli_args, 'connect_timeout', CONNECT_TIMEOUT),
+            getattr(cli_args, 'read_timeout', READ_TIMEOUT)
+        ),
+        getattr(cli_args, 'retries', RETRIES),
+        getattr(cli_args, 'max_rps', MAX_RPS),
     )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
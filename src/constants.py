@@ -1,23 +1,90 @@
+import os
+from datetime import timedelta
 from pathlib import Path
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_BASE_URL = 'https://peps.python.org/'
+PEP_API_URL = PEP_BASE_URL + 'api/peps.json'
 
 BASE_DIR = Path(__file__).parent
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
+TEXT_LOG = 'text'
+JSON_LOG = 'json'
 DOWNLOADS_DIR = 'downloads'
 RESULTS_DIR = 'results'
+PROFILES_DIR = 'profiles'
+JOURNAL_DIR = 'journal'
+PEP_INDEX_FILE = BASE_DIR / 'pep_index.json'
+MEMO_FILE = BASE_DIR / 'extract_memo.sqlite'
 
 STARTUP_TEXT = 'Парсер запущен!'
 FINISH_TEXT = 'Парсер завершил работу.'
 MISMATCHED_STATUS_TEXT = 'Ошибка в статусах:'
 NOT_FOUND_TEXT = 'Ничего не нашлось'
 
+ALL_MODES = 'all'
+
+API_SOURCE = 'api'
+PAGES_SOURCE = 'pages'
+
+CACHE_NAME = 'http_cache'
+CACHE_ACCESS_FILE = 'http_cache_access.json'
+SQLITE_BACKEND = 'sqlite'
+FILESYSTEM_BACKEND = 'filesystem'
+MEMORY_BACKEND = 'memory'
+
 PRETTY_CASE = 'pretty'
 FILE_CASE = 'file'
+JSONL_CASE = 'jsonl'
+SQLITE_CASE = 'sqlite'
+CONSOLE_OUTPUTS = (None, PRETTY_CASE)
+RESULTS_DB = 'results.sqlite'
+PEP_TOTAL = 'Всего'
 
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
+# Метка запуска в SQLite: до микросекунд, чтобы запуски не совпадали.
+RUN_AT_FORMAT = '%Y-%m-%d_%H-%M-%S.%f'
+
+WORKERS = 8
+IN_FLIGHT_FACTOR = 2
+WATCH_INTERVAL = 60 * 60
+# На одноядерной машине пул процессов только добавляет затраты на запуск.
+PARSE_WORKERS = os.cpu_count() if (os.cpu_count() or 1) > 1 else 0
+
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+INITIAL_CONCURRENCY = 2
+MAX_RPS = 20
+
+# Правила срока жизни кеша: шаблон URL (сопоставляется по префиксу, первый
+# подходящий побеждает) -> срок. Просроченные страницы с ETag/Last-Modified
+# перепроверяются условным запросом.
+EXPIRE_AFTER = timedelta(days=1)
+# Единственный осмысленный отрицательный срок кеша: хранить бессрочно.
+NEVER_EXPIRE = -1
+# Страницы PEP живут столько же, сколько индекс, иначе смена статуса
+# выглядела бы расхождением. Надолго кешируются только «Что нового» давно
+# вышедших 2.x и 3.0-3.9; страницы новых версий ещё правятся.
+URLS_EXPIRE_AFTER = {
+    'peps.python.org/': timedelta(hours=1),
+    'docs.python.org/3/whatsnew/2.': timedelta(days=30),
+    'docs.python.org/3/whatsnew/3.?.html': timedelta(days=30),
+    'docs.python.org/3/whatsnew/': timedelta(hours=6),
+    'docs.python.org/3/': timedelta(hours=1),
+}
+CHUNK_SIZE = 64 * 1024
+FLUSH_EVERY = 100
+INSERT_BATCH = 500
+CHECKPOINT_EVERY = 50
+COLUMN_WIDTH = 60
+SAMPLE_ROWS = 100
+PAGE_ROWS = 50
 
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
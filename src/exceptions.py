@@ -6,3 +6,8 @@ class ParserFindTagException(Exception):
 class TextNotFound(Exception):
     """Вызывается, когда подстрока не была найдена в строке."""
     pass
+
+
+class ShardError(Exception):
+    """Вызывается, когда части обхода pep нельзя свести вместе."""
+    pass
@@ -0,0 +1,190 @@
+import json
+import re
+from io import BytesIO
+
+from bs4 import SoupStrainer
+from lxml.etree import iterparse
+from lxml.html import fragment_fromstring
+
+from constants import NOT_FOUND_TEXT
+from exceptions import TextNotFound
+from profiling import timed
+from utils import find_tag, make_soup, select
+
+WHATS_NEW_TARGET = SoupStrainer(id='what-s-new-in-python')
+VERSION_INFO_TARGET = SoupStrainer(('h1', 'dl'))
+PEP_CONTENT_TARGET = SoupStrainer('section', {'id': 'pep-content'})
+
+PEP_CONTENT_START = re.compile(rb'<section\b[^>]*\bid="pep-content"')
+VERSION_PATTERN = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+
+# Версии входят в ключ сохранённых результатов (см. memo.py): после
+# изменения извлекателя увеличьте его версию.
+EXTRACTOR_VERSIONS = {
+    'version_links': 1,
+    'version_info': 1,
+    'versions': 1,
+    'pep_rows': 2,
+    'pep_status': 1,
+}
+
+
+def extract_version_links(soup):
+    return [
+        a_tag['href'] for a_tag in select(
+            soup, '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
+        )
+    ]
+
+
+def element_text(element):
+    return ''.join(element.itertext())
+
+
+def index_table_rows(content):
+    """Строки tbody таблиц #index-by-category table.pep-zero-table.
+
+    Индекс читается потоково, а каждая строка удаляется из дерева сразу
+    после обработки, поэтому память не растёт с числом PEP так, как
+    с деревом BeautifulSoup целой страницы.
+    """
+    in_index = in_body = False
+    for event, element in iterparse(
+            BytesIO(content), events=('start', 'end'), html=True
+    ):
+        if event == 'start':
+            if element.get('id') == 'index-by-category':
+                in_index = True
+            elif in_index and element.tag == 'tbody':
+                table_class = element.getparent().get('class', '')
+                in_body = 'pep-zero-table' in table_class.split()
+            continue
+        if in_body and element.tag == 'tr':
+            yield element
+        elif element.tag == 'tbody':
+            in_body = False
+        elif element.get('id') == 'index-by-category':
+            in_index = False
+        if element.tag in ('tr', 'table'):
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+
+def pep_rows(content):
+    with timed('parse'):
+        return [
+            (
+                element_text(tr.find('.//a')).strip(),
+                tr.find('.//a').get('href'),
+                element_text(tr.find('.//abbr')),
+            )
+            for tr in index_table_rows(content)
+        ]
+
+
+def extract_version_info(soup):
+    return (find_tag(soup, 'h1').text,
+            find_tag(soup, 'dl').text.replace('\n', ' '))
+
+
+def extract_versions(soup):
+    ul_tags = select(soup, 'div.sphinxsidebarwrapper ul')
+    for ul in ul_tags:
+        if 'All versions' in ul.text:
+            a_tags = ul.find_all('a')
+            break
+    else:
+        raise TextNotFound(NOT_FOUND_TEXT)
+    for a_tag in a_tags:
+        text_matched = re.search(VERSION_PATTERN, a_tag.text)
+        if text_matched:
+            version, status = text_matched.groups()
+        else:
+            version, status = a_tag.text, ''
+        yield a_tag['href'], version, status
+
+
+def extract_pep_status(soup):
+    page_section_tag = find_tag(soup, 'section', {'id': 'pep-content'})
+    return page_section_tag.find(
+        string='Status'
+    ).parent.find_next_sibling().string
+
+
+def element_string(element):
+    """Аналог Tag.string из BeautifulSoup для элемента lxml."""
+    children = list(element)
+    if not children:
+        return element.text
+    if len(children) == 1 and not element.text and not children[0].tail:
+        return element_string(children[0])
+    return None
+
+
+def pep_fields(content):
+    """Поля шапки PEP, найденные прямо в байтах страницы.
+
+    Разбирается только первый <dl> внутри section#pep-content; если
+    его не удалось найти, возвращается пустой словарь.
+    """
+    section = PEP_CONTENT_START.search(content)
+    if section is None:
+        return {}
+    dl_start = content.find(b'<dl', section.end())
+    dl_end = content.find(b'</dl>', dl_start)
+    if dl_start == -1 or dl_end == -1:
+        return {}
+    dl_tag = fragment_fromstring(
+        content[dl_start:dl_end + len(b'</dl>')].decode('utf-8', 'replace')
+    )
+    fields = {}
+    for dt_tag in dl_tag.iterchildren('dt'):
+        dd_tag = dt_tag.getnext()
+        if dd_tag is not None and dd_tag.tag == 'dd':
+            fields.setdefault(dt_tag.text, element_string(dd_tag))
+    return fields
+
+
+def pep_status(content):
+    with timed('extract'):
+        status = pep_fields(content).get('Status')
+    if status is not None:
+        return status
+    return soup_extractor(extract_pep_status, PEP_CONTENT_TARGET)(content)
+
+
+def soup_extractor(extract, parse_only=None):
+    """Извлекатель, который разбирает страницу и сразу освобождает дерево.
+
+    Дерево BeautifulSoup полно ссылочных циклов и без decompose()
+    дожидалось бы сборщика мусора, поэтому extract должен вернуть
+    данные, не ссылающиеся на его узлы.
+    """
+    def extractor(content):
+        soup = make_soup(
+            content.decode('utf-8', 'replace'), parse_only=parse_only
+        )
+        try:
+            return extract(soup)
+        finally:
+            soup.decompose()
+    return extractor
+
+
+EXTRACTORS = {
+    'version_links': soup_extractor(extract_version_links, WHATS_NEW_TARGET),
+    'version_info': soup_extractor(extract_version_info, VERSION_INFO_TARGET),
+    'versions': soup_extractor(lambda soup: list(extract_versions(soup))),
+    'pep_rows': pep_rows,
+    'pep_status': pep_status,
+}
+
+
+def extract_record(extractor, content):
+    """Запись из тела страницы в виде JSON-совместимых списков и строк.
+
+    Вызывается в процессах пула разбора, поэтому принимает только имя
+    извлекателя и байты, а возвращает небольшую сериализуемую запись.
+    """
+    return json.loads(json.dumps(EXTRACTORS[extractor](content)))
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+from threading import Lock
+
+from constants import CHECKPOINT_EVERY
+
+JOURNAL_RESUMED = 'Продолжение по журналу {path}: готово URL: {count}'
+JOURNAL_TRUNCATED = 'Журнал {path}: отброшена неполная последняя строка'
+
+
+def read_journal(path):
+    """Записи журнала и длина его целой части в байтах.
+
+    Строка, оборванная сбоем посреди записи, не заканчивается переводом
+    строки или не разбирается как JSON; она и всё после неё
+    отбрасываются.
+    """
+    records = {}
+    valid_size = 0
+    with open(path, 'rb') as file:
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            records[entry['url']] = entry['record']
+            valid_size += len(line)
+    return records, valid_size
+
+
+class Journal:
+    """Дописываемый журнал завершённых URL и извлечённых из них записей.
+
+    Каждая строка — JSON-объект {"url": ..., "record": ...}, который
+    записывается одним вызовом write и сразу сбрасывается в ОС, а раз в
+    CHECKPOINT_EVERY строк ещё и на диск через fsync. С resume=True
+    записи прошлого запуска загружаются, и wrap() возвращает их без
+    повторной загрузки страниц.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.lock = Lock()
+        self.pending = 0
+        self.records = {}
+        path.parent.mkdir(exist_ok=True)
+        if resume and path.exists():
+            self.records, valid_size = read_journal(path)
+            if valid_size != path.stat().st_size:
+                logging.warning(JOURNAL_TRUNCATED.format(path=path))
+                os.truncate(path, valid_size)
+            logging.info(JOURNAL_RESUMED.format(
+                path=path, count=len(self.records)
+            ))
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        self.close()
+        if exc_type is None:
+            self.path.unlink()
+
+    def add(self, url, record):
+        line = json.dumps(
+            {'url': url, 'record': record}, ensure_ascii=False
+        ) + '\n'
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(line)
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= CHECKPOINT_EVERY:
+                os.fsync(self.file.fileno())
+                self.pending = 0
+
+    def wrap(self, func, key=lambda item: item):
+        """func(item) с записью результата в журнал по URL key(item)."""
+        def journaled(item):
+            url = key(item)
+            if url in self.records:
+                return self.records[url]
+            record = func(item)
+            self.add(url, record)
+            return record
+        return journaled
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
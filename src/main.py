@@ -1,82 +1,125 @@
 import logging
-import re
-from collections import defaultdict
+import signal
+import sys
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from datetime import datetime
+from functools import partial
+from operator import itemgetter
 from urllib.parse import urljoin
 
-import requests_cache
-from tqdm import tqdm
-
-from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, DOWNLOADS_DIR, EXPECTED_STATUS, FINISH_TEXT,
-                       MAIN_DOC_URL, MISMATCHED_STATUS_TEXT, NOT_FOUND_TEXT,
-                       PEP_BASE_URL, STARTUP_TEXT)
-from outputs import control_output
-from exceptions import TextNotFound
-from utils import find_tag, get_dir_path, get_soup
+from cache import CacheTracker, access_path
+from configs import (configure_argument_parser, configure_logging,
+                     configure_session)
+from constants import (ALL_MODES, API_SOURCE, BASE_DIR, CONSOLE_OUTPUTS,
+                       DATETIME_FORMAT, DOWNLOADS_DIR, EXPECTED_STATUS,
+                       FINISH_TEXT, JOURNAL_DIR, MAIN_DOC_URL, MEMO_FILE,
+                       MISMATCHED_STATUS_TEXT, PARSE_WORKERS, PEP_API_URL,
+                       PEP_BASE_URL, PEP_INDEX_FILE, PROFILES_DIR,
+                       STARTUP_TEXT, WORKERS)
+from journal import Journal
+from outputs import control_output, pretty_output, results_path
+from pep_index import PepIndex, content_hash
+from profiling import profiler
+from shards import (SHARD_FILE, PepTally, in_shard, merge_shards,
+                    status_rows)
+from watch import Watcher
+from utils import (download_file, fetch_concurrently, get_dir_path,
+                   get_response, get_soup)
 
 ARCHIVE_SAVED = 'Архив был загружен и сохранён: {archive_path}'
 STATUS_ERROR = ('Страница: {0}'
                 ' Статус в карточке: {1}'
                 ' Ожидаемые статусы: {2}')
 ARGS = 'Аргументы командной строки: {args}'
+MODE_REQUIRED = ('Укажите режим работы парсера, --merge'
+                 ' или флаг --cache-stats')
+MODE_ERROR = 'Режим {mode} завершился с ошибкой: {error}'
+UNKNOWN_INTERVAL_MODE = 'Неизвестный режим в --interval: {mode}'
 SOUP_ERROR = 'Ошибка: {error} URL: {link}'
+SHARD_SAVED = 'Часть {index}/{count} режима pep сохранена: {path}'
+SHARD_WITHOUT_PEP = 'Флаг --shard применим только к режиму pep'
 
 
-def whats_new(session):
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-    errors = []
-    for a_tag in tqdm(
-            get_soup(
-                session, urljoin(MAIN_DOC_URL, 'whatsnew/')
-            ).select(
-                '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
-            )):
-        version_link = urljoin(
-            urljoin(MAIN_DOC_URL, 'whatsnew/'),
-            a_tag['href']
-        )
-        try:
-            soup = get_soup(session, version_link)
-        except ConnectionError as error:
-            errors.append(SOUP_ERROR.format(
-                error=error, link=version_link
-            ))
-            continue
-        results.append(
-            (version_link,
-             find_tag(soup, 'h1').text,
-             find_tag(soup, 'dl').text.replace('\n', ' '))
-        )
+@contextmanager
+def page_parser(cli_args=None):
+    from extractors import EXTRACTOR_VERSIONS
+    from memo import ExtractionMemo
+    from parsing import ParsePool
+
+    with ExtractionMemo(MEMO_FILE, EXTRACTOR_VERSIONS) as memo, ParsePool(
+            memo, getattr(cli_args, 'parse_workers', PARSE_WORKERS)
+    ) as parser:
+        yield parser
+
+
+def open_journal(cli_args, mode):
+    """Журнал завершённых URL режима; с --resume — журнал прошлого запуска."""
+    return Journal(
+        get_dir_path(BASE_DIR, JOURNAL_DIR) / f'{mode}.jsonl',
+        getattr(cli_args, 'resume', False)
+    )
+
+
+def get_record(session, parser, extractor, url, pooled=False):
+    """Данные страницы: сохранённые или извлечённые из её разбора."""
+    return parser.extract(
+        extractor, get_response(session, url).content, pooled=pooled
+    )
+
+
+def get_version_info(session, parser, version_link):
+    return (version_link, *get_record(
+        session, parser, 'version_info', version_link, pooled=True
+    ))
+
+
+def iter_whats_new(session, cli_args=None):
+    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
+    with page_parser(cli_args) as parser, open_journal(
+            cli_args, 'whats-new'
+    ) as journal:
+        version_links = [
+            urljoin(whats_new_url, href) for href in get_record(
+                session, parser, 'version_links', whats_new_url
+            )
+        ]
+        yield 'Ссылка на статью', 'Заголовок', 'Редактор, Автор'
+        errors = []
+        for version_link, (version_info, error) in zip(
+                version_links,
+                fetch_concurrently(
+                    journal.wrap(partial(get_version_info, session, parser)),
+                    version_links,
+                    getattr(cli_args, 'workers', WORKERS)
+                )
+        ):
+            if error is not None:
+                errors.append(SOUP_ERROR.format(
+                    error=error, link=version_link
+                ))
+                continue
+            yield tuple(version_info)
     list(map(logging.error, errors))
-    return results
 
 
-def latest_versions(session):
-    soup = get_soup(session, MAIN_DOC_URL)
-    if not soup:
-        return
-    ul_tags = soup.select('div.sphinxsidebarwrapper ul')
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise TextNotFound(NOT_FOUND_TEXT)
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        text_matched = re.search(pattern, a_tag.text)
-        if text_matched:
-            version, status = text_matched.groups()
-        else:
-            version, status = a_tag.text, ''
-        results.append(
-            (a_tag['href'], version, status)
-        )
-    return results
+def whats_new(session, cli_args=None):
+    return list(iter_whats_new(session, cli_args))
+
+
+def iter_latest_versions(session, cli_args=None):
+    with page_parser(cli_args) as parser:
+        versions = get_record(session, parser, 'versions', MAIN_DOC_URL)
+    yield 'Ссылка на документацию', 'Версия', 'Статус'
+    yield from map(tuple, versions)
 
 
-def download(session):
+def latest_versions(session, *args):
+    return list(iter_latest_versions(session, *args))
+
+
+def download(session, *args):
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
     pdf_a4_link = get_soup(session, downloads_url).select_one(
         'table.docutils'
@@ -86,52 +129,160 @@ def download(session):
     filename = archive_url.split('/')[-1]
     downloads_dir = get_dir_path(BASE_DIR, DOWNLOADS_DIR)
     downloads_dir.mkdir(exist_ok=True)
-    response = session.get(archive_url)
-    archive_path = downloads_dir / filename
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
+    archive_path = download_file(
+        session, archive_url, downloads_dir / filename
+    )
     logging.info(ARCHIVE_SAVED.format(archive_path=archive_path))
 
 
-def pep(session):
-    soup = get_soup(session, PEP_BASE_URL)
-    table_tags = soup.select('#index-by-category table.pep-zero-table')
-    results = defaultdict(lambda: 0)
-    errors = [MISMATCHED_STATUS_TEXT]
-    for table in tqdm(table_tags):
-        tr_tags = table.tbody.find_all('tr')
-        for tr in tr_tags:
-            page_link = urljoin(PEP_BASE_URL, tr.a['href'])
-            try:
-                page_soup = get_soup(session, page_link)
-            except ConnectionError as error:
-                errors.append(SOUP_ERROR.format(
-                    error=error, link=page_link
-                ))
-                continue
-            page_section_tag = find_tag(page_soup,
-                                        'section',
-                                        {'id': 'pep-content'})
-            actual_status = page_section_tag.find(
-                string='Status'
-            ).parent.find_next_sibling().string
-
-            preview_status = tr.abbr.text[1:]
-            if actual_status not in EXPECTED_STATUS[preview_status]:
-                errors.append(
-                    STATUS_ERROR.format(
-                        page_link,
-                        actual_status,
-                        EXPECTED_STATUS[preview_status]
-                    )
-                )
-            results[actual_status] += 1
-    list(map(logging.error, errors))
-    return [
-        ('Статус', 'Количество'),
-        *results.items(),
-        ('Всего', sum(results.values())),
-    ]
+def get_pep_status(session, pep_index, parser, incremental, pep_row):
+    """Статус PEP со страницы; с incremental — по индексу прошлых запусков.
+
+    Строка индекса без изменений перепроверяется на сервере условным
+    запросом мимо срока жизни кеша (refresh), а новая или изменившаяся
+    строка загружается заново без кеша (force_refresh).
+    """
+    number, page_link, preview = pep_row
+    entry = pep_index.get(number) if incremental else None
+    kwargs = {}
+    if incremental and (entry is None or entry['row'] != preview):
+        entry = None
+        kwargs['force_refresh'] = True
+    elif entry is not None:
+        kwargs['refresh'] = True
+        kwargs['headers'] = headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+    response = get_response(session, page_link, **kwargs)
+    if entry is not None and response.status_code == 304:
+        return entry['status']
+    digest = content_hash(response.content)
+    status = parser.extract(
+        'pep_status', response.content, digest, pooled=True
+    )
+    pep_index.update(
+        number,
+        row=preview,
+        status=status,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+    )
+    return status
+
+
+def page_statuses(session, parser, pep_rows, cli_args=None):
+    if not pep_rows:
+        return
+    pep_index = PepIndex(PEP_INDEX_FILE)
+    try:
+        with open_journal(cli_args, 'pep') as journal:
+            yield from fetch_concurrently(
+                journal.wrap(
+                    partial(
+                        get_pep_status,
+                        session,
+                        pep_index,
+                        parser,
+                        getattr(cli_args, 'incremental', False)
+                    ),
+                    key=itemgetter(1)
+                ),
+                pep_rows,
+                getattr(cli_args, 'workers', WORKERS)
+            )
+    finally:
+        pep_index.save()
+
+
+def api_statuses(session, parser, pep_rows, cli_args=None):
+    peps = {
+        number: pep['status']
+        for number, pep in get_response(session, PEP_API_URL).json().items()
+    }
+    with closing(page_statuses(
+            session,
+            parser,
+            [row for row in pep_rows if row[0] not in peps],
+            cli_args
+    )) as scraped:
+        for number, *_ in pep_rows:
+            yield (peps[number], None) if number in peps else next(scraped)
+
+
+def pep_status_errors(pep_rows, statuses, tally):
+    """Считает статусы в tally и отдаёт расхождения по мере обхода.
+
+    pep_rows — пары (позиция в индексе, строка индекса).
+    """
+    for (position, (_, page_link, preview)), (actual_status, error) in zip(
+            pep_rows, statuses
+    ):
+        if error is not None:
+            yield position, SOUP_ERROR.format(error=error, link=page_link)
+            continue
+        preview_status = preview[1:]
+        if actual_status not in EXPECTED_STATUS[preview_status]:
+            yield position, STATUS_ERROR.format(
+                page_link,
+                actual_status,
+                EXPECTED_STATUS[preview_status]
+            )
+        tally.add(position, actual_status)
+
+
+def iter_pep(session, cli_args=None):
+    shard = getattr(cli_args, 'shard', None)
+    tally = PepTally()
+    with page_parser(cli_args) as parser:
+        pep_rows = [
+            (number, urljoin(PEP_BASE_URL, href), preview)
+            for number, href, preview in get_record(
+                session, parser, 'pep_rows', PEP_BASE_URL
+            )
+        ]
+        shard_rows = [
+            (position, row) for position, row in enumerate(pep_rows)
+            if shard is None or in_shard(row[0], shard)
+        ]
+        rows = [row for _, row in shard_rows]
+        if getattr(cli_args, 'pep_source', API_SOURCE) == API_SOURCE:
+            statuses = api_statuses(session, parser, rows, cli_args)
+        else:
+            statuses = page_statuses(session, parser, rows, cli_args)
+        logging.error(MISMATCHED_STATUS_TEXT)
+        for position, error in pep_status_errors(shard_rows, statuses, tally):
+            logging.error(error)
+            if shard is not None:
+                tally.add_error(position, error)
+    if shard is not None:
+        index, count = shard
+        shard_path = results_path(SHARD_FILE.format(index=index, count=count))
+        tally.save(shard_path, shard, pep_rows)
+        logging.info(SHARD_SAVED.format(
+            index=index, count=count, path=shard_path
+        ))
+    yield from status_rows(tally.counts)
+
+
+def iter_merged_pep(paths):
+    counts, errors = merge_shards(paths)
+    logging.error(MISMATCHED_STATUS_TEXT)
+    for error in errors:
+        logging.error(error)
+    yield from status_rows(counts)
+
+
+def pep(session, cli_args=None):
+    return list(iter_pep(session, cli_args))
+
+
+def save_profile(parser_mode):
+    profiles_dir = get_dir_path(BASE_DIR, PROFILES_DIR)
+    profiles_dir.mkdir(exist_ok=True)
+    now_formatted = datetime.now().strftime(DATETIME_FORMAT)
+    profiler.save(profiles_dir / f'{parser_mode}_{now_formatted}.json')
 
 
 MODE_TO_FUNCTION = {
@@ -140,29 +291,160 @@ MODE_TO_FUNCTION = {
     'download': download,
     'pep': pep,
 }
+MODE_TO_ROWS = {
+    'whats-new': iter_whats_new,
+    'latest-versions': iter_latest_versions,
+    'download': download,
+    'pep': iter_pep,
+}
 
 
-def main():
-    configure_logging()
+def selected_modes(modes):
+    if ALL_MODES in modes:
+        return list(MODE_TO_ROWS)
+    return list(dict.fromkeys(modes))
 
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
-    args = arg_parser.parse_args()
+
+def run_mode(session, cli_args, buffered=False):
+    """Выполняет режим cli_args.mode и выводит его результаты.
+
+    С buffered=True строки для вывода в консоль не печатаются, а
+    возвращаются списком, чтобы параллельные режимы не смешивали вывод.
+    """
+    results = MODE_TO_ROWS[cli_args.mode](session, cli_args)
+    if results is None:
+        return None
+    if buffered and cli_args.output in CONSOLE_OUTPUTS:
+        return list(results)
+    control_output(results, cli_args)
+
+
+def mode_namespace(cli_args, mode):
+    return Namespace(**{**vars(cli_args), 'mode': mode})
+
+
+def run_modes(session, cli_args, modes):
+    """Параллельно запускает режимы на общей сессии и пуле соединений."""
+    modes_args = [mode_namespace(cli_args, mode) for mode in modes]
+    if len(modes_args) == 1:
+        run_mode(session, modes_args[0])
+        return
+    with ThreadPoolExecutor(max_workers=len(modes_args)) as executor:
+        futures = [
+            executor.submit(run_mode, session, mode_args, True)
+            for mode_args in modes_args
+        ]
+        for mode_args, future in zip(modes_args, futures):
+            try:
+                rows = future.result()
+            except Exception as error:
+                logging.error(MODE_ERROR.format(
+                    mode=mode_args.mode, error=error
+                ))
+                continue
+            if rows is not None:
+                control_output(rows, mode_args)
+
+
+def watch_modes(session, cli_args, modes, after_run):
+    """Перезапускает режимы по их интервалам на тёплой сессии."""
+    modes_args = {mode: mode_namespace(cli_args, mode) for mode in modes}
+    intervals = dict.fromkeys(modes, cli_args.watch_interval)
+    intervals.update(
+        (mode, seconds) for mode, seconds in cli_args.interval
+        if mode in intervals
+    )
+
+    def run(mode):
+        results = MODE_TO_ROWS[mode](session, modes_args[mode])
+        rows = None if results is None else list(results)
+        after_run()
+        return rows
+
+    Watcher(
+        run,
+        lambda mode, rows: control_output(rows, modes_args[mode]),
+        intervals
+    ).watch(modes)
+
+
+def checked_modes(arg_parser, cli_args):
+    modes = selected_modes(cli_args.mode)
+    if not modes and not cli_args.cache_stats and not cli_args.merge:
+        arg_parser.error(MODE_REQUIRED)
+    if cli_args.shard is not None and 'pep' not in modes:
+        arg_parser.error(SHARD_WITHOUT_PEP)
+    for mode, _ in cli_args.interval:
+        if mode not in MODE_TO_ROWS:
+            arg_parser.error(UNKNOWN_INTERVAL_MODE.format(mode=mode))
+    return modes
+
+
+def run_session(args, modes):
+    """Выполняет режимы и обслуживание кеша на общей сессии."""
+    session = configure_session(args)
+    cache_tracker = CacheTracker(access_path(args.cache_backend))
+    session.hooks['response'].append(cache_tracker.on_response)
+    if args.clear_cache:
+        session.cache.clear()
+
+    maintain_cache = partial(
+        cache_tracker.maintain, session.cache, args.cache_max_size
+    )
+    if args.watch and modes:
+        watch_modes(session, args, modes, maintain_cache)
+    elif modes:
+        run_modes(session, args, modes)
+    maintain_cache()
+    if args.cache_stats:
+        pretty_output(cache_tracker.stats(session.cache))
+        cache_tracker.save()
+
+
+def run(arg_parser, args):
+    """Выполняет выбранные режимы; логирование уже настроено."""
     logging.info(STARTUP_TEXT)
     logging.info(ARGS.format(args=args))
+    profiler.enabled = args.profile
 
-    try:
-        session = requests_cache.CachedSession()
-        if args.clear_cache:
-            session.cache.clear()
-
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
+    modes = checked_modes(arg_parser, args)
 
-        if results is not None:
-            control_output(results, args)
+    try:
+        if args.merge:
+            control_output(
+                iter_merged_pep(args.merge), mode_namespace(args, 'pep')
+            )
+        if modes or args.cache_stats:
+            run_session(args, modes)
         logging.info(FINISH_TEXT)
     except Exception as error:
         logging.error(error)
+    from adapters import log_http_stats
+    log_http_stats()
+    if args.profile:
+        save_profile(
+            '_'.join(modes) or ('merge' if args.merge else 'cache-stats')
+        )
+
+
+def exit_on_signal(signum, frame):
+    """SIGTERM завершает работу через SystemExit, а не сразу.
+
+    Так выполняются блоки finally, и очередь лога успевает сброситься.
+    """
+    sys.exit(128 + signum)
+
+
+def main():
+    arg_parser = configure_argument_parser((*MODE_TO_FUNCTION, ALL_MODES))
+    args = arg_parser.parse_args()
+    log_listener = configure_logging(args.log_format)
+    sigterm_handler = signal.signal(signal.SIGTERM, exit_on_signal)
+    try:
+        run(arg_parser, args)
+    finally:
+        signal.signal(signal.SIGTERM, sigterm_handler)
+        log_listener.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+from threading import Lock
+
+from pep_index import content_hash
+from profiling import timed
+
+
+class ExtractionMemo:
+    """Сохранённые результаты извлечения данных из страниц.
+
+    Ключ записи — имя извлекателя, его версия и хеш тела ответа, так что
+    неизменившаяся страница не разбирается повторно, а смена версии
+    извлекателя сбрасывает только его записи. Соединение работает в
+    режиме автокоммита с WAL-журналом, поэтому несколько экземпляров
+    могут одновременно писать в один файл.
+    """
+
+    def __init__(self, path, versions):
+        self.versions = versions
+        self.lock = Lock()
+        self.connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS records ('
+            ' extractor TEXT NOT NULL,'
+            ' version INTEGER NOT NULL,'
+            ' hash TEXT NOT NULL,'
+            ' record TEXT NOT NULL,'
+            ' PRIMARY KEY (extractor, version, hash))'
+        )
+        for extractor, version in versions.items():
+            self.connection.execute(
+                'DELETE FROM records WHERE extractor = ? AND version != ?',
+                (extractor, version)
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get(self, extractor, digest):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT record FROM records'
+                ' WHERE extractor = ? AND version = ? AND hash = ?',
+                (extractor, self.versions[extractor], digest)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, extractor, digest, record):
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)',
+                (
+                    extractor, self.versions[extractor], digest,
+                    json.dumps(record, ensure_ascii=False)
+                )
+            )
+
+    def extract(self, extractor, content, func, digest=None):
+        """Результат func() для content, если его ещё нет в памяти."""
+        digest = digest or content_hash(content)
+        with timed('memo'):
+            record = self.get(extractor, digest)
+        if record is None:
+            record = func()
+            self.put(extractor, digest, record)
+        return record
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
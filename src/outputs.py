@@ -1,48 +1,260 @@
 import csv
+import json
 import logging
+import sqlite3
+import unicodedata
 from datetime import datetime
+from itertools import chain, islice
 
-from prettytable import PrettyTable
-
-from constants import (BASE_DIR, DATETIME_FORMAT, FILE_CASE, PRETTY_CASE,
-                       RESULTS_DIR)
+from constants import (BASE_DIR, COLUMN_WIDTH, DATETIME_FORMAT, FILE_CASE,
+                       FLUSH_EVERY, INSERT_BATCH, JSONL_CASE, PAGE_ROWS,
+                       PEP_TOTAL, PRETTY_CASE, RESULTS_DB, RESULTS_DIR,
+                       RUN_AT_FORMAT, SAMPLE_ROWS, SQLITE_CASE)
+from profiling import profiler
 from utils import get_dir_path
 
 FILE_SAVED_PHRASE = 'Файл с результатами был сохранён: {file_path}'
+RUN_SAVED_PHRASE = ('Результаты режима {mode} записаны в {file_path}:'
+                    ' {count} строк, запуск {run_at}')
+
+# Режим -> (таблица SQLite, столбцы строк без заголовка).
+MODE_COLUMNS = {
+    'whats-new': ('whats_new', ('link', 'title', 'editor')),
+    'latest-versions': ('latest_versions', ('link', 'version', 'status')),
+    'pep': ('pep_statuses', ('status', 'count')),
+}
+# Режим -> (таблица последних значений, ключ): строки запуска обновляют
+# в ней значение по ключу, а ключи, пропавшие из запуска, удаляются, так
+# что таблица хранит состояние на последний запуск без просмотра истории.
+LATEST_TABLES = {'pep': ('pep_latest_statuses', 'status')}
+# Итоговая строка режима хранится в runs.total, а не среди строк запуска.
+TOTAL_LABELS = {'pep': PEP_TOTAL}
+ELLIPSIS = '…'
 
 
-def file_output(results, cli_args):
+def results_path(name):
     results_dir = get_dir_path(BASE_DIR, RESULTS_DIR)
     results_dir.mkdir(exist_ok=True)
+    return results_dir / name
+
+
+def run_timestamp(time_format=DATETIME_FORMAT):
+    return datetime.now().strftime(time_format)
+
+
+def file_output(results, cli_args):
     parser_mode = cli_args.mode
-    now_formatted = datetime.now().strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = results_dir / file_name
+    now_formatted = run_timestamp()
+    file_path = results_path(f'{parser_mode}_{now_formatted}.csv')
     with open(file_path, 'w', encoding='utf-8') as f:
-        csv.writer(f, dialect=csv.unix_dialect).writerows(results)
+        writer = csv.writer(f, dialect=csv.unix_dialect)
+        for count, row in enumerate(results, 1):
+            writer.writerow(row)
+            if count % FLUSH_EVERY == 0:
+                f.flush()
 
     logging.info(FILE_SAVED_PHRASE.format(file_path=file_path))
 
 
+def jsonl_output(results, cli_args):
+    """Дописывает строки запуска в results/<режим>.jsonl."""
+    _, columns = MODE_COLUMNS[cli_args.mode]
+    run_at = run_timestamp()
+    file_path = results_path(f'{cli_args.mode}.jsonl')
+    rows = iter(results)
+    next(rows, None)
+    count = 0
+    with open(file_path, 'a', encoding='utf-8') as f:
+        for count, row in enumerate(rows, 1):
+            f.write(json.dumps(
+                {'mode': cli_args.mode, 'run_at': run_at,
+                 **dict(zip(columns, row))},
+                ensure_ascii=False
+            ) + '\n')
+            if count % FLUSH_EVERY == 0:
+                f.flush()
+    logging.info(RUN_SAVED_PHRASE.format(
+        mode=cli_args.mode, file_path=file_path, count=count, run_at=run_at
+    ))
+
+
+def create_tables(connection, table, columns, latest):
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS runs ('
+        ' mode TEXT NOT NULL, run_at TEXT NOT NULL, rows INTEGER NOT NULL,'
+        ' total INTEGER, PRIMARY KEY (mode, run_at))'
+    )
+    connection.execute(
+        f'CREATE TABLE IF NOT EXISTS {table} ('
+        ' run_at TEXT NOT NULL, position INTEGER NOT NULL,'
+        f' {", ".join(columns)},'
+        ' PRIMARY KEY (run_at, position))'
+    )
+    for column in columns[:1]:
+        connection.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}'
+            f' ON {table} ({column}, run_at)'
+        )
+    if latest:
+        latest_table, key = latest
+        connection.execute(
+            f'CREATE TABLE IF NOT EXISTS {latest_table} ('
+            f' {key} PRIMARY KEY,'
+            f' {", ".join(column for column in columns if column != key)},'
+            ' run_at TEXT NOT NULL)'
+        )
+
+
+def upsert_latest(connection, latest, columns, run_at, batch):
+    latest_table, key = latest
+    values = ', '.join('?' * (len(columns) + 1))
+    connection.executemany(
+        f'INSERT INTO {latest_table} ({", ".join(columns)}, run_at)'
+        f' VALUES ({values}) ON CONFLICT ({key}) DO UPDATE SET '
+        + ', '.join(
+            f'{column} = excluded.{column}'
+            for column in (*columns, 'run_at') if column != key
+        ),
+        [(*row, run_at) for _, _, *row in batch]
+    )
+
+
+def sqlite_output(results, cli_args):
+    """Записывает запуск в results/results.sqlite одной транзакцией.
+
+    Строки вставляются пачками по INSERT_BATCH; при сбое посреди
+    запуска транзакция откатывается целиком. Итоговая строка режима
+    попадает в runs.total, а для режимов из LATEST_TABLES строки ещё и
+    обновляют таблицу последних значений.
+    """
+    table, columns = MODE_COLUMNS[cli_args.mode]
+    latest = LATEST_TABLES.get(cli_args.mode)
+    total_label = TOTAL_LABELS.get(cli_args.mode)
+    run_at = run_timestamp(RUN_AT_FORMAT)
+    file_path = results_path(RESULTS_DB)
+    values = ', '.join('?' * (len(columns) + 2))
+    insert = (
+        f'INSERT INTO {table} (run_at, position, {", ".join(columns)})'
+        f' VALUES ({values})'
+    )
+    total = None
+    rows = iter(results)
+    next(rows, None)
+    numbered = (
+        (run_at, position, *row) for position, row in enumerate(rows, 1)
+    )
+    connection = sqlite3.connect(str(file_path), timeout=60)
+    count = 0
+    try:
+        with connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            create_tables(connection, table, columns, latest)
+            while True:
+                batch = list(islice(numbered, INSERT_BATCH))
+                if not batch:
+                    break
+                # Итоговая строка всегда последняя в выводе режима.
+                if batch[-1][2] == total_label:
+                    total = batch.pop()[3]
+                connection.executemany(insert, batch)
+                if latest:
+                    upsert_latest(connection, latest, columns, run_at, batch)
+                count += len(batch)
+            if latest:
+                # Ключи, которых нет в этом запуске, больше не актуальны.
+                connection.execute(
+                    f'DELETE FROM {latest[0]} WHERE run_at != ?', (run_at,)
+                )
+            connection.execute(
+                'INSERT INTO runs VALUES (?, ?, ?, ?)',
+                (cli_args.mode, run_at, count, total)
+            )
+    finally:
+        connection.close()
+    logging.info(RUN_SAVED_PHRASE.format(
+        mode=cli_args.mode, file_path=file_path, count=count, run_at=run_at
+    ))
+
+
 def default_output(results, *args):
     for row in results:
         print(*row)
 
 
-def pretty_output(results, *args):
-    table = PrettyTable()
-    table.field_names = results[0]
-    table.align = 'l'
-    table.add_rows(results[1:])
-    print(table)
+def char_width(char):
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in 'WF' else 1
+
+
+def cell_text(value):
+    return str(value).replace('\n', ' ')
+
+
+def text_width(text):
+    return sum(map(char_width, text))
+
+
+def fit_cell(text, width):
+    """Обрезает text до width колонок и дополняет пробелами."""
+    text_size = text_width(text)
+    if text_size > width:
+        text_size = 0
+        for end, char in enumerate(text):
+            if text_size + char_width(char) > width - len(ELLIPSIS):
+                break
+            text_size += char_width(char)
+        text, text_size = text[:end] + ELLIPSIS, text_size + len(ELLIPSIS)
+    return text + ' ' * (width - text_size)
+
+
+def table_rule(widths):
+    return '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+
+
+def table_line(row, widths):
+    return '| ' + ' | '.join(
+        fit_cell(cell_text(cell), width) for cell, width in zip(row, widths)
+    ) + ' |'
+
+
+def pretty_output(results, cli_args=None):
+    """Печатает строки таблицей по мере их поступления.
+
+    Ширина столбцов берётся по заголовку и первым SAMPLE_ROWS строкам,
+    но не больше --column-width; более длинные ячейки обрезаются.
+    Строки выводятся страницами по PAGE_ROWS, так что первая страница
+    появляется, не дожидаясь остальных строк.
+    """
+    max_width = getattr(cli_args, 'column_width', COLUMN_WIDTH)
+    rows = iter(results)
+    header = next(rows, None)
+    if header is None:
+        return
+    sample = list(islice(rows, SAMPLE_ROWS))
+    widths = [
+        min(max_width, max(text_width(cell_text(cell)) for cell in column))
+        for column in zip(header, *sample)
+    ]
+    rule = table_rule(widths)
+    page = [rule, table_line(header, widths), rule]
+    for row in chain(sample, rows):
+        page.append(table_line(row, widths))
+        if len(page) >= PAGE_ROWS:
+            print('\n'.join(page), flush=True)
+            page = []
+    page.append(rule)
+    print('\n'.join(page), flush=True)
 
 
 OUTPUT_TYPES = {
     PRETTY_CASE: pretty_output,
     FILE_CASE: file_output,
+    JSONL_CASE: jsonl_output,
+    SQLITE_CASE: sqlite_output,
     None: default_output
 }
 
 
 def control_output(results, cli_args):
-    OUTPUT_TYPES[cli_args.output](results, cli_args)
+    profiler.timed_output(OUTPUT_TYPES[cli_args.output], results, cli_args)
@@ -0,0 +1,75 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from threading import Lock
+
+from constants import PARSE_WORKERS
+from extractors import extract_record
+from profiling import profiler, timed
+
+
+def profiled_extract_record(extractor, content):
+    """extract_record в процессе пула вместе с замерами фаз разбора."""
+    profiler.enabled = True
+    profiler.take_samples()
+    record = extract_record(extractor, content)
+    return record, profiler.take_samples()
+
+
+class ParsePool:
+    """Второй этап конвейера: разбор страниц в пуле процессов.
+
+    Потоки загрузки передают сюда байты ответа и ждут готовую запись.
+    В пул уходят только страницы обхода (pooled=True); одиночные
+    страницы вроде индексов разбираются на месте, чтобы не платить за
+    запуск процессов. Пул запускается при первом промахе мимо
+    сохранённых результатов, а при workers=0 весь разбор выполняется
+    прямо в потоке загрузки. При --profile замеры фаз из процессов пула
+    переносятся в профиль основного процесса.
+    """
+
+    def __init__(self, memo, workers=PARSE_WORKERS):
+        self.memo = memo
+        self.workers = workers
+        self.lock = Lock()
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.executor
+
+    def parse(self, extractor, content, pooled=False):
+        if not self.workers or not pooled:
+            return extract_record(extractor, content)
+        executor = self.get_executor()
+        with timed('parse_pool'):
+            if not profiler.enabled:
+                return executor.submit(
+                    extract_record, extractor, content
+                ).result()
+            record, samples = executor.submit(
+                profiled_extract_record, extractor, content
+            ).result()
+        profiler.merge(samples)
+        return record
+
+    def extract(self, extractor, content, digest=None, pooled=False):
+        return self.memo.extract(
+            extractor, content,
+            partial(self.parse, extractor, content, pooled), digest
+        )
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
@@ -0,0 +1,35 @@
+import hashlib
+import json
+import os
+from threading import Lock
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class PepIndex:
+    """Сохраняемый между запусками индекс статусов PEP."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.entries = {}
+        if path.exists():
+            self.entries = json.loads(path.read_text(encoding='utf-8'))
+
+    def get(self, number):
+        return self.entries.get(number)
+
+    def update(self, number, **fields):
+        with self.lock:
+            self.entries[number] = fields
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with self.lock:
+            tmp_path.write_text(
+                json.dumps(self.entries, ensure_ascii=False, indent=1),
+                encoding='utf-8'
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,150 @@
+import json
+import logging
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from threading import Lock, local
+from time import perf_counter
+from types import SimpleNamespace
+
+PROFILE_SAVED = 'Профиль запуска был сохранён: {path}'
+PHASE_SUMMARY = ('Фаза {phase}: {count} вызовов, всего {total_s:.3f} с,'
+                 ' p50 {p50_ms:.1f} мс, p95 {p95_ms:.1f} мс,'
+                 ' max {max_ms:.1f} мс')
+SLOWEST_URLS = 10
+
+
+def percentile(samples, share):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def summarize(samples):
+    """Сводка замеров; её же используют бенчмарки в benchmarks/."""
+    total = sum(samples)
+    return {
+        'count': len(samples),
+        'total_s': total,
+        'mean_ms': total / len(samples) * 1000,
+        'p50_ms': percentile(samples, 0.5) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'max_ms': max(samples) * 1000,
+        'per_s': len(samples) / (total or 1e-9),
+    }
+
+
+class Profiler:
+    """Замеры времени по фазам и URL, включаемые флагом --profile.
+
+    Пока профилирование выключено, timed() возвращает общий пустой
+    контекст, так что замеры почти ничего не стоят.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = Lock()
+        self.local = local()
+        self.samples = defaultdict(list)
+        self.null_timer = nullcontext(SimpleNamespace())
+
+    def set_url(self, url):
+        if self.enabled:
+            self.local.url = url
+
+    def record(self, phase, url, seconds):
+        with self.lock:
+            self.samples[phase].append((seconds, url))
+
+    def take_samples(self):
+        """Забирает накопленные замеры, например, в процессе пула."""
+        with self.lock:
+            samples, self.samples = self.samples, defaultdict(list)
+        return dict(samples)
+
+    def merge(self, samples):
+        """Добавляет замеры процесса пула к URL текущего потока."""
+        url = getattr(self.local, 'url', None)
+        for phase, phase_samples in samples.items():
+            for seconds, sample_url in phase_samples:
+                self.record(phase, sample_url or url, seconds)
+
+    def timed(self, phase, url=None):
+        if not self.enabled:
+            return self.null_timer
+        return self._timed(phase, url or getattr(self.local, 'url', None))
+
+    @contextmanager
+    def _timed(self, phase, url):
+        sample = SimpleNamespace(phase=phase)
+        started = perf_counter()
+        try:
+            yield sample
+        finally:
+            self.record(sample.phase, url, perf_counter() - started)
+
+    def timed_output(self, output, results, *args):
+        """Замеряет вывод без учёта времени, потраченного на сами строки."""
+        if not self.enabled:
+            return output(results, *args)
+        produced = 0
+
+        def rows():
+            nonlocal produced
+            iterator = iter(results)
+            while True:
+                started = perf_counter()
+                try:
+                    row = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    produced += perf_counter() - started
+                yield row
+
+        started = perf_counter()
+        try:
+            return output(rows(), *args)
+        finally:
+            self.record('output', None, perf_counter() - started - produced)
+
+    def report(self, slowest=SLOWEST_URLS):
+        by_url = defaultdict(lambda: defaultdict(float))
+        for phase, samples in self.samples.items():
+            for seconds, url in samples:
+                if url is not None:
+                    by_url[url][phase] += seconds
+        return {
+            'phases': {
+                phase: summarize([seconds for seconds, _ in samples])
+                for phase, samples in self.samples.items()
+            },
+            'slowest_urls': [
+                {
+                    'url': url,
+                    'total_ms': sum(phases.values()) * 1000,
+                    'phases_ms': {
+                        phase: seconds * 1000
+                        for phase, seconds in phases.items()
+                    },
+                }
+                for url, phases in sorted(
+                    by_url.items(),
+                    key=lambda item: sum(item[1].values()),
+                    reverse=True
+                )[:slowest]
+            ],
+        }
+
+    def save(self, path):
+        report = self.report()
+        path.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2),
+            encoding='utf-8'
+        )
+        for phase, summary in report['phases'].items():
+            logging.info(PHASE_SUMMARY.format(phase=phase, **summary))
+        logging.info(PROFILE_SAVED.format(path=path))
+        return report
+
+
+profiler = Profiler()
+timed = profiler.timed
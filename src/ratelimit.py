@@ -0,0 +1,86 @@
+import time
+from threading import Condition, Lock
+
+from constants import INITIAL_CONCURRENCY
+
+DECREASE_FACTOR = 0.5
+EWMA_ALPHA = 0.2
+BASELINE_DRIFT = 1.01
+LATENCY_TOLERANCE = 2
+LATENCY_SLACK = 0.05
+
+
+class HostLimiter:
+    """Окно параллельных запросов к хосту, подбираемое по AIMD.
+
+    Пока задержка стабильна, окно растёт примерно на единицу за
+    «поколение» запросов; ответ 429/503, таймаут или рост задержки
+    вдвое над базовой уменьшают его вдвое, но не чаще раза за поколение.
+    Запросы вдобавок разносятся по времени так, чтобы не превышать
+    max_rps в секунду.
+    """
+
+    def __init__(self, maximum, max_rps=None, initial=INITIAL_CONCURRENCY):
+        self.maximum = maximum
+        self.interval = 1 / max_rps if max_rps else 0
+        self.limit = float(min(initial, maximum))
+        self.active = 0
+        self.condition = Condition()
+        self.next_slot = 0
+        self.latency = None
+        self.baseline = None
+        self.decreased_at = 0
+
+    def acquire(self):
+        """Ждёт места в окне и очереди по max_rps; возвращает время старта."""
+        with self.condition:
+            while self.active >= int(self.limit):
+                self.condition.wait()
+            self.active += 1
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return time.monotonic()
+
+    def congested(self):
+        return self.latency > (
+            self.baseline * LATENCY_TOLERANCE + LATENCY_SLACK
+        )
+
+    def release(self, started, throttled=False):
+        finished = time.monotonic()
+        latency = finished - started
+        with self.condition:
+            self.active -= 1
+            if self.latency is None:
+                self.latency = self.baseline = latency
+            else:
+                self.latency += EWMA_ALPHA * (latency - self.latency)
+                self.baseline = min(
+                    self.baseline * BASELINE_DRIFT, self.latency
+                )
+            if throttled or self.congested():
+                if started >= self.decreased_at:
+                    self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+                    self.decreased_at = finished
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+class RateController:
+    """Ограничители для каждого хоста, к которому идут запросы."""
+
+    def __init__(self, maximum, max_rps=None):
+        self.maximum = maximum
+        self.max_rps = max_rps
+        self.lock = Lock()
+        self.limiters = {}
+
+    def limiter(self, host):
+        with self.lock:
+            if host not in self.limiters:
+                self.limiters[host] = HostLimiter(self.maximum, self.max_rps)
+            return self.limiters[host]
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from constants import PEP_TOTAL
+from exceptions import ShardError
+
+PEP_HEADER = ('Статус', 'Количество')
+SHARD_FILE = 'pep_shard_{index}_of_{count}.json'
+
+SHARD_COUNT_MISMATCH = 'Части получены при разном числе узлов: {counts}'
+SHARDS_INCOMPLETE = 'Ожидались части 1..{count}, получены: {indexes}'
+SHARD_INDEX_MISMATCH = 'Части собраны по разным версиям индекса PEP'
+
+
+def in_shard(number, shard):
+    """Попадает ли PEP с номером number в часть shard = (i, N)."""
+    index, count = shard
+    return int(number) % count == index - 1
+
+
+def index_digest(pep_rows):
+    return hashlib.sha256(json.dumps(
+        pep_rows, ensure_ascii=False
+    ).encode()).hexdigest()
+
+
+def status_rows(counts):
+    yield PEP_HEADER
+    yield from counts.items()
+    yield PEP_TOTAL, sum(counts.values())
+
+
+class PepTally:
+    """Счётчики статусов PEP с позицией первой строки индекса.
+
+    По позициям частичные результаты нескольких узлов сводятся в
+    таблицу с тем же порядком статусов, что и при обходе на одном узле.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.first_positions = {}
+        self.errors = []
+
+    def add(self, position, status):
+        self.counts[status] = self.counts.get(status, 0) + 1
+        self.first_positions.setdefault(status, position)
+
+    def add_error(self, position, error):
+        self.errors.append((position, error))
+
+    def save(self, path, shard, pep_rows):
+        """Атомарно пишет часть shard в JSON-файл path."""
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(json.dumps({
+            'shard': shard,
+            'index': index_digest(pep_rows),
+            'statuses': [
+                (status, count, self.first_positions[status])
+                for status, count in self.counts.items()
+            ],
+            'errors': self.errors,
+        }, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+def merge_shards(paths):
+    """Сводит файлы частей в счётчики статусов и список расхождений.
+
+    Части должны быть получены при одном числе узлов N по одному
+    индексу PEP и покрывать все номера 1..N.
+    """
+    shards = [
+        json.loads(Path(path).read_text(encoding='utf-8')) for path in paths
+    ]
+    counts = {shard['shard'][1] for shard in shards}
+    if len(counts) != 1:
+        raise ShardError(SHARD_COUNT_MISMATCH.format(counts=sorted(counts)))
+    count, = counts
+    indexes = sorted(shard['shard'][0] for shard in shards)
+    if indexes != list(range(1, count + 1)):
+        raise ShardError(SHARDS_INCOMPLETE.format(
+            count=count, indexes=indexes
+        ))
+    if len({shard['index'] for shard in shards}) != 1:
+        raise ShardError(SHARD_INDEX_MISMATCH)
+    tally = PepTally()
+    for shard in shards:
+        for status, number, position in shard['statuses']:
+            tally.counts[status] = tally.counts.get(status, 0) + number
+            tally.first_positions[status] = min(
+                position, tally.first_positions.get(status, position)
+            )
+    merged = {
+        status: tally.counts[status]
+        for status in sorted(tally.counts, key=tally.first_positions.get)
+    }
+    errors = sorted(
+        tuple(error) for shard in shards for error in shard['errors']
+    )
+    return merged, [error for _, error in errors]
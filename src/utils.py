@@ -1,17 +1,42 @@
-from bs4 import BeautifulSoup
-from requests import RequestException
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+from constants import CHUNK_SIZE, IN_FLIGHT_FACTOR, WORKERS
 from exceptions import ParserFindTagException
+from profiling import profiler, timed
 
 RESPONSE_ERROR = ('Возникла ошибка при загрузке страницы {url}'
                   'Ошибка: {error}')
 
 TAG_NOT_FOUND = 'Не найден тег {tag} {attrs}'
+DOWNLOAD_SKIPPED = 'Файл {path} не изменился на сервере, загрузка пропущена'
+DOWNLOAD_RESUMED = 'Продолжение загрузки {path} с {offset} байт'
+DOWNLOAD_COMPLETED = 'Частичный файл {path} уже загружен целиком'
+DOWNLOAD_RESTARTED = ('Сервер отклонил дозагрузку {path} (416),'
+                      ' файл загружается заново')
+DOWNLOAD_SPEED = ('Загружено {size} байт за {seconds:.2f} с'
+                  ' ({speed:.0f} байт/с)')
 
+PART_SUFFIX = '.part'
+VALIDATOR_SUFFIX = '.etag'
 
-def get_response(session, url, encoding='utf-8'):
+# requests, bs4 и tqdm импортируются внутри функций, чтобы запуск
+# с --help или с ошибкой в аргументах их не загружал
+# (см. tests/test_startup.py).
+
+
+def get_response(session, url, encoding='utf-8', method='GET', **kwargs):
+    from requests import RequestException
+
+    profiler.set_url(url)
     try:
-        response = session.get(url)
+        with timed('fetch', url) as sample:
+            response = session.request(method, url, **kwargs)
+            if getattr(response, 'from_cache', False):
+                sample.phase = 'cache'
         response.encoding = encoding
         return response
     except RequestException as error:
@@ -21,12 +46,20 @@ def get_response(session, url, encoding='utf-8'):
         ))
 
 
-def get_soup(session, url, features='lxml'):
-    return BeautifulSoup(get_response(session, url).text, features)
+def make_soup(markup, features='lxml', parse_only=None):
+    from bs4 import BeautifulSoup
+
+    with timed('parse'):
+        return BeautifulSoup(markup, features, parse_only=parse_only)
+
+
+def get_soup(session, url, features='lxml', parse_only=None):
+    return make_soup(get_response(session, url).text, features, parse_only)
 
 
 def find_tag(soup, tag, attrs=None):
-    searched_tag = soup.find(tag, attrs=(attrs or {}))
+    with timed('find_tag'):
+        searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
         raise ParserFindTagException(TAG_NOT_FOUND.format(
             tag=tag, attrs=attrs
@@ -34,5 +67,129 @@ def find_tag(soup, tag, attrs=None):
     return searched_tag
 
 
+def select(soup, selector):
+    with timed('select'):
+        return soup.select(selector)
+
+
+def future_result(future):
+    try:
+        return future.result(), None
+    except ConnectionError as error:
+        return None, error
+
+
+def fetch_concurrently(func, items, workers=WORKERS):
+    """Вызывает func для каждого элемента в пуле потоков.
+
+    Лениво отдаёт пары (результат, ошибка) в порядке items, как только
+    готов очередной элемент; ConnectionError не прерывает обход.
+    Одновременно в работе не больше workers * IN_FLIGHT_FACTOR
+    элементов, поэтому память не растёт с их числом.
+    """
+    from tqdm import tqdm
+
+    items = list(items)
+    window = workers * IN_FLIGHT_FACTOR
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor, tqdm(
+            total=len(items)
+    ) as progress:
+        for item in items:
+            if len(pending) == window:
+                yield future_result(pending.popleft())
+            future = executor.submit(func, item)
+            future.add_done_callback(lambda _: progress.update())
+            pending.append(future)
+        while pending:
+            yield future_result(pending.popleft())
+
+
+def is_up_to_date(path, size, validator, saved_validator):
+    if not path.exists() or (size is None and validator is None):
+        return False
+    return (
+        (size is None or int(size) == path.stat().st_size)
+        and (validator is None or validator == saved_validator)
+    )
+
+
+def download_file(session, url, path, chunk_size=CHUNK_SIZE):
+    """Потоково скачивает url в path через временный .part файл.
+
+    Частично скачанный файл дозагружается Range-запросом, если валидатор
+    (ETag или Last-Modified) на сервере не изменился. Если файл уже
+    совпадает с серверным по размеру и валидатору, загрузка пропускается.
+    """
+    from requests_cache import DO_NOT_CACHE
+
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    validator_path = path.with_name(path.name + VALIDATOR_SUFFIX)
+    saved_validator = (
+        validator_path.read_text() if validator_path.exists() else None
+    )
+    head = get_response(
+        session, url, method='HEAD',
+        allow_redirects=True, expire_after=DO_NOT_CACHE
+    )
+    validator = head.headers.get('ETag') or head.headers.get('Last-Modified')
+    size = head.headers.get('Content-Length')
+    if is_up_to_date(path, size, validator, saved_validator):
+        logging.info(DOWNLOAD_SKIPPED.format(path=path))
+        return path
+    headers = {}
+    if (
+            part_path.exists()
+            and validator is not None
+            and validator == saved_validator
+    ):
+        headers = {
+            'Range': f'bytes={part_path.stat().st_size}-',
+            'If-Range': validator,
+        }
+    started = time.monotonic()
+    response = get_response(
+        session, url, headers=headers,
+        stream=True, expire_after=DO_NOT_CACHE
+    )
+    if response.status_code == 416 and headers:
+        response.close()
+        if size is not None and part_path.stat().st_size == int(size):
+            logging.info(DOWNLOAD_COMPLETED.format(path=path))
+            os.replace(part_path, path)
+            return path
+        # Полноту .part не подтвердить: без удаления каждый следующий
+        # запуск снова получал бы 416 на тот же Range.
+        logging.warning(DOWNLOAD_RESTARTED.format(path=path))
+        part_path.unlink()
+        response = get_response(
+            session, url, stream=True, expire_after=DO_NOT_CACHE
+        )
+    with response:
+        response.raise_for_status()
+        if validator is None:
+            validator_path.unlink(missing_ok=True)
+        else:
+            validator_path.write_text(validator)
+        if response.status_code == 206:
+            logging.info(DOWNLOAD_RESUMED.format(
+                path=path, offset=part_path.stat().st_size
+            ))
+            mode = 'ab'
+        else:
+            mode = 'wb'
+        received = 0
+        with open(part_path, mode) as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+                received += len(chunk)
+    os.replace(part_path, path)
+    seconds = time.monotonic() - started
+    logging.info(DOWNLOAD_SPEED.format(
+        size=received, seconds=seconds, speed=received / (seconds or 1e-9)
+    ))
+    return path
+
+
 def get_dir_path(base, directory):
     return base / directory
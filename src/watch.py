@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import sched
+import signal
+import time
+from threading import Event
+
+WATCH_STARTED = 'Наблюдение за режимом {mode}: каждые {interval} с'
+WATCH_UNCHANGED = 'Результаты режима {mode} не изменились'
+WATCH_ERROR = 'Режим {mode} завершился с ошибкой: {error}'
+WATCH_STOPPED = 'Получен сигнал {signal}, наблюдение остановлено'
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def fingerprint(rows):
+    return hashlib.sha256(json.dumps(
+        rows, ensure_ascii=False, default=str
+    ).encode()).hexdigest()
+
+
+class Watcher:
+    """Перезапускает режимы по расписанию, пока не придёт SIGTERM.
+
+    run(mode) возвращает строки режима (или None), emit(mode, rows)
+    выводит их; вывод происходит только при изменении строк. Ожидание
+    между запусками прерывается сигналом сразу, а начатый запуск
+    доводится до конца.
+    """
+
+    def __init__(self, run, emit, intervals):
+        self.run = run
+        self.emit = emit
+        self.intervals = intervals
+        self.stopped = Event()
+        self.scheduler = sched.scheduler(time.monotonic, self.stopped.wait)
+        self.fingerprints = {}
+
+    def tick(self, mode):
+        try:
+            rows = self.run(mode)
+        except Exception as error:
+            logging.error(WATCH_ERROR.format(mode=mode, error=error))
+        else:
+            self.publish(mode, rows)
+        if not self.stopped.is_set():
+            self.scheduler.enter(self.intervals[mode], 0, self.tick, (mode,))
+
+    def publish(self, mode, rows):
+        if rows is None:
+            return
+        digest = fingerprint(rows)
+        if self.fingerprints.get(mode) == digest:
+            logging.info(WATCH_UNCHANGED.format(mode=mode))
+            return
+        self.fingerprints[mode] = digest
+        self.emit(mode, rows)
+
+    def stop(self, signum=None, frame=None):
+        if signum is not None:
+            logging.info(WATCH_STOPPED.format(
+                signal=signal.Signals(signum).name
+            ))
+        self.stopped.set()
+        for event in self.scheduler.queue:
+            try:
+                self.scheduler.cancel(event)
+            except ValueError:
+                pass
+
+    def watch(self, modes):
+        for mode in modes:
+            logging.info(WATCH_STARTED.format(
+                mode=mode, interval=self.intervals[mode]
+            ))
+            self.scheduler.enter(0, 0, self.tick, (mode,))
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in STOP_SIGNALS
+        }
+        try:
+            self.scheduler.run()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
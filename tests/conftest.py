@@ -72,6 +72,29 @@ def mock_session(tempfile_session) -> CachedSession:
     yield mount_mock_adapter(tempfile_session)
 
 
+@pytest.fixture(autouse=True)
+def memo_file(monkeypatch, tmp_path):
+    """Сохранённые результаты и журнал пишутся во временный каталог"""
+    from src import main
+    path = tmp_path / 'extract_memo.sqlite'
+    monkeypatch.setattr(main, 'MEMO_FILE', path)
+    monkeypatch.setattr(main, 'JOURNAL_DIR', tmp_path / 'journal')
+    return path
+
+
+@pytest.fixture(scope='session')
+def corpus_adapter() -> Adapter:
+    from benchmarks.corpus import build_adapter
+    return build_adapter()
+
+
+@pytest.fixture(scope='function')
+def corpus_session(tempfile_session, corpus_adapter) -> CachedSession:
+    """CachedSession, отдающий страницы из офлайн-корпуса benchmarks/corpus"""
+    from benchmarks.corpus import mount_corpus
+    yield mount_corpus(tempfile_session, corpus_adapter)
+
+
 @pytest.fixture
 def response_page(mock_session):
     def _response_page(page):
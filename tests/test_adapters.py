@@ -0,0 +1,86 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import time
+
+import pytest
+import requests
+
+try:
+    from src import adapters
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `adapters.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `adapters.py`'
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Отвечает 503 на первые запросы к /flaky и засыпает на /slow."""
+
+    failures = {}
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(1)
+        left = self.failures.get(self.path, 0)
+        if left:
+            self.failures[self.path] = left - 1
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def make_session(timeout=5, retries=3):
+    session = requests.Session()
+    session.mount('http://', adapters.build_adapter(2, timeout, retries))
+    return session
+
+
+def test_retries_transient_errors(local_server):
+    adapters.http_stats.clear()
+    FlakyHandler.failures['/flaky'] = 2
+    response = make_session().get(local_server + '/flaky')
+    assert response.status_code == 200, (
+        'Ответы 5xx должны повторяться, пока не придёт успешный ответ'
+    )
+    assert adapters.http_stats['retries'] == 2
+    assert adapters.http_stats[503] == 2
+
+
+def test_default_timeout(local_server):
+    adapters.http_stats.clear()
+    with pytest.raises(requests.exceptions.RequestException):
+        make_session(timeout=0.2, retries=1).get(local_server + '/slow')
+    assert adapters.http_stats['timeouts'] == 2, (
+        'Таймаут по умолчанию должен применяться к каждой попытке'
+    )
+    assert adapters.http_stats['retries'] == 1, (
+        'Последняя неудачная попытка не должна считаться повтором'
+    )
+
+
+def test_no_retries_counted_without_retries(local_server):
+    adapters.http_stats.clear()
+    with pytest.raises(requests.exceptions.RequestException):
+        make_session(timeout=0.2, retries=0).get(local_server + '/slow')
+    assert adapters.http_stats['retries'] == 0, (
+        'С --retries 0 повторов быть не должно'
+    )
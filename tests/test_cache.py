@@ -0,0 +1,40 @@
+try:
+    from src import cache
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+PAGES = [
+    MAIN_DOC_URL,
+    MAIN_DOC_URL + 'download.html',
+    MAIN_DOC_URL + 'whatsnew/',
+]
+
+
+def test_cache_tracker_evicts_least_recently_used(corpus_session, tmp_path):
+    path = tmp_path / 'access.json'
+    tracker = cache.CacheTracker(path)
+    corpus_session.hooks['response'].append(tracker.on_response)
+    for url in PAGES:
+        corpus_session.get(url)
+    corpus_session.get(PAGES[0])
+    stats = dict(tracker.stats(corpus_session.cache))
+    assert stats['Записей'] == 3
+    assert (stats['Попаданий'], stats['Промахов']) == (1, 3)
+
+    tracker.evict(corpus_session.cache, stats['Байт'] - 1)
+    assert [
+        url for url in PAGES
+        if corpus_session.cache.contains(url=url)
+    ] == [PAGES[0], PAGES[2]], (
+        'Из кеша должны вытесняться давно не использованные записи'
+    )
+
+    tracker.save()
+    saved = cache.CacheTracker(path)
+    assert (saved.hits, saved.misses) == (1, 3), (
+        'Счётчики попаданий должны сохраняться между запусками'
+    )
+    assert len(saved.entries) == 2
@@ -1,5 +1,10 @@
 import pytest
 import argparse
+import json
+import logging
+from datetime import timedelta
+from logging.handlers import QueueHandler
+import requests_mock
 try:
     from src import configs
 except ModuleNotFoundError:
@@ -29,7 +34,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'sqlite'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +69,148 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_configure_session_revalidates_expired_pages(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    url = 'https://docs.python.org/3/whatsnew/3.12.html'
+    session = configs.configure_session(
+        argparse.Namespace(cache_expire=[('docs.python.org/3/whatsnew', 0)])
+    )
+    assert next(iter(session.settings.urls_expire_after)) == (
+        'docs.python.org/3/whatsnew'
+    ), 'Правила из `--cache-expire` должны проверяться первыми'
+
+    def page(request, context):
+        if request.headers.get('If-None-Match') == '"v1"':
+            context.status_code = 304
+            return ''
+        context.headers['ETag'] = '"v1"'
+        return 'What’s New In Python 3.12'
+
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text=page)
+        session.get(url)
+        got = session.get(url)
+    assert mock.last_request.headers.get('If-None-Match') == '"v1"', (
+        'Просроченная страница должна перепроверяться условным запросом'
+    )
+    assert got.text == 'What’s New In Python 3.12'
+
+
+@pytest.mark.parametrize('url, expire_after', [
+    ('https://peps.python.org/', timedelta(hours=1)),
+    ('https://peps.python.org/pep-0008/', timedelta(hours=1)),
+    ('https://docs.python.org/3/whatsnew/2.7.html', timedelta(days=30)),
+    ('https://docs.python.org/3/whatsnew/3.9.html', timedelta(days=30)),
+    ('https://docs.python.org/3/whatsnew/3.13.html', timedelta(hours=6)),
+    ('https://docs.python.org/3/whatsnew/3.14.html', timedelta(hours=6)),
+])
+def test_default_expire_rules(url, expire_after):
+    from requests_cache.policy import get_url_expiration
+
+    assert get_url_expiration(url, configs.URLS_EXPIRE_AFTER) == (
+        expire_after
+    ), 'Долго кешироваться должны только страницы давних версий'
+
+
+def test_argument_parser_accepts_several_modes():
+    parser = configs.configure_argument_parser(['whats-new', 'pep', 'all'])
+    assert parser.parse_args(['whats-new', 'pep']).mode == ['whats-new', 'pep']
+    assert parser.parse_args(['--cache-stats']).mode == [], (
+        'Запуск без режимов должен разбираться в пустой список'
+    )
+    with pytest.raises(SystemExit):
+        parser.parse_args(['whats-new', 'unknown'])
+
+
+def test_merge_does_not_take_mode():
+    parser = configs.configure_argument_parser(['whats-new', 'pep', 'all'])
+    args = parser.parse_args(['--merge', 'a.json', '--merge', 'b.json', 'pep'])
+    assert args.merge == ['a.json', 'b.json'] and args.mode == ['pep'], (
+        'Флаг --merge не должен забирать следующий за файлами режим'
+    )
+
+
+def test_watch_does_not_take_mode():
+    parser = configs.configure_argument_parser(['whats-new', 'pep', 'all'])
+    args = parser.parse_args(['--watch', 'pep'])
+    assert args.watch and args.mode == ['pep'], (
+        'Флаг --watch не должен забирать следующий за ним режим'
+    )
+    assert args.watch_interval == configs.WATCH_INTERVAL
+    args = parser.parse_args(['--watch-interval', '30', 'pep'])
+    assert args.watch_interval == 30 and not args.watch
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--watch-interval', '0', 'pep'])
+
+
+@pytest.fixture
+def root_handlers():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+@pytest.mark.parametrize('log_format', ['text', 'json'])
+def test_configure_logging_uses_queue(
+        monkeypatch, tmp_path, root_handlers, log_format
+):
+    monkeypatch.setattr(configs, 'LOG_DIR', tmp_path)
+    monkeypatch.setattr(configs, 'LOG_FILE', tmp_path / 'parser.log')
+    listener = configs.configure_logging(log_format)
+    handler, = logging.getLogger().handlers
+    assert isinstance(handler, QueueHandler), (
+        'Логи должны передаваться в фоновый поток через QueueHandler'
+    )
+    for number in range(100):
+        logging.error('Запись %s', number)
+    listener.stop()
+    lines = (tmp_path / 'parser.log').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 100, (
+        'Записи из очереди должны быть дописаны при остановке'
+    )
+    if log_format == 'json':
+        entry = json.loads(lines[-1])
+        assert entry['level'] == 'ERROR'
+        assert entry['message'] == 'Запись 99'
+    else:
+        assert lines[-1].endswith('[ERROR] - Запись 99"')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1/3', (1, 3)), ('3/3', (3, 3)), ('0/3', None), ('4/3', None),
+    ('1', None), ('a/b', None),
+])
+def test_shard_spec(value, expected):
+    if expected is None:
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.shard_spec(value)
+    else:
+        assert configs.shard_spec(value) == expected
+
+
+@pytest.mark.parametrize('args', [
+    ['--retries', '-5'],
+    ['--cache-expire', 'peps.python.org/*=-5'],
+    ['--cache-expire', 'peps.python.org/*'],
+])
+def test_argument_parser_rejects_bad_numbers(args):
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(args)
+
+
+def test_expire_rule_never_expire():
+    assert configs.expire_rule('peps.python.org/*=-1') == (
+        'peps.python.org/*', -1
+    ), 'Срок -1 означает бессрочное хранение в кеше'
+
+
+@pytest.mark.parametrize('value', ['inf', 'infK', '-1M', 'nan', '1X'])
+def test_byte_size_rejects_bad_sizes(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.byte_size(value)
+    assert configs.byte_size('1.5K') == 1536
@@ -0,0 +1,71 @@
+import pytest
+from bs4 import BeautifulSoup
+
+try:
+    from src import extractors
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+
+PEP_PAGE = (
+    '<html><body><section id="pep-content"><h1>PEP 8</h1>'
+    '<dl class="rfc2822 field-list simple">'
+    '<dt class="field-odd">Author<span class="colon">:</span></dt>'
+    '<dd class="field-odd">Guido van Rossum</dd>'
+    '<dt class="field-even">Status<span class="colon">:</span></dt>'
+    '{status}</dl><p>Status</p></section></body></html>'
+)
+
+
+def soup_status(content):
+    return extractors.extract_pep_status(
+        BeautifulSoup(content.decode('utf-8'), 'lxml')
+    )
+
+
+def test_pep_status_matches_soup_on_corpus(corpus_session):
+    from benchmarks.corpus import PEP_BASE_URL, pep_rows
+    for number, *_ in pep_rows():
+        content = corpus_session.get(f'{PEP_BASE_URL}pep-{number:04d}/').content
+        assert extractors.pep_status(content) == soup_status(content), (
+            f'Быстрый разбор PEP {number} расходится с BeautifulSoup'
+        )
+
+
+@pytest.mark.parametrize('status_dd', [
+    '<dd class="field-even"><abbr title="Accepted">Final</abbr></dd>',
+    '<dd>Active</dd>',
+    '<dd><abbr>April Fool!</abbr></dd>',
+    '<dd><abbr>Final</abbr> (since 3.9)</dd>',
+])
+def test_pep_status_matches_soup(status_dd):
+    content = PEP_PAGE.format(status=status_dd).encode()
+    assert extractors.pep_status(content) == soup_status(content)
+
+
+def test_pep_fields():
+    content = PEP_PAGE.format(status='<dd><abbr>Final</abbr></dd>').encode()
+    assert extractors.pep_fields(content) == {
+        'Author': 'Guido van Rossum', 'Status': 'Final'
+    }
+
+
+def test_pep_status_falls_back_to_soup():
+    content = (
+        b'<html><body><section class="x" id="pep-content"><p>'
+        b'<b>Status</b><i>Draft</i></p></section></body></html>'
+    )
+    assert extractors.pep_fields(content) == {}
+    assert extractors.pep_status(content) == 'Draft'
+
+
+def test_pep_rows_match_soup_on_corpus(corpus_session):
+    from benchmarks.corpus import PEP_BASE_URL
+    content = corpus_session.get(PEP_BASE_URL).content
+    soup = BeautifulSoup(content.decode('utf-8'), 'lxml')
+    assert extractors.pep_rows(content) == [
+        (tr.a.text.strip(), tr.a['href'], tr.abbr.text)
+        for table in soup.select('#index-by-category table.pep-zero-table')
+        for tr in table.tbody.find_all('tr')
+    ], 'Потоковый разбор индекса PEP расходится с BeautifulSoup'
@@ -0,0 +1,65 @@
+from argparse import Namespace
+
+try:
+    from src import journal, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `journal.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `journal.py`'
+
+PEP_8 = 'https://peps.python.org/pep-0008/'
+PEP_1 = 'https://peps.python.org/pep-0001/'
+
+
+def test_journal_drops_truncated_last_line(tmp_path):
+    path = tmp_path / 'pep.jsonl'
+    first = journal.Journal(path)
+    first.add(PEP_8, 'Active')
+    first.close()
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"url": "' + PEP_1 + '", "rec')
+    resumed = journal.Journal(path, resume=True)
+    assert resumed.records == {PEP_8: 'Active'}, (
+        'Оборванная последняя строка журнала должна отбрасываться'
+    )
+    resumed.add(PEP_1, 'Active')
+    resumed.close()
+    records, size = journal.read_journal(path)
+    assert records == {PEP_8: 'Active', PEP_1: 'Active'}, (
+        'Новые записи должны дописываться после целой части журнала'
+    )
+    assert size == path.stat().st_size
+
+
+def test_journal_removed_after_complete_run(tmp_path):
+    path = tmp_path / 'pep.jsonl'
+    with journal.Journal(path) as complete:
+        complete.add(PEP_8, 'Active')
+    assert not path.exists(), 'Журнал завершённого запуска не нужен'
+
+
+def test_whats_new_resumes_remaining_urls(corpus_session):
+    full = main.whats_new(corpus_session, Namespace(workers=1))
+    rows = main.iter_whats_new(corpus_session, Namespace(workers=1))
+    for _ in range(3):
+        next(rows)
+    rows.close()
+    journal_path = main.JOURNAL_DIR / 'whats-new.jsonl'
+    done, _ = journal.read_journal(journal_path)
+    assert 0 < len(done) < len(full) - 1, (
+        'Прерванный запуск должен оставить журнал готовых URL'
+    )
+    fetched = []
+    corpus_session.hooks['response'].append(
+        lambda response, *args, **kwargs: fetched.append(response.url)
+    )
+    resumed = main.whats_new(
+        corpus_session, Namespace(workers=1, resume=True)
+    )
+    assert resumed == full, (
+        'Продолжение по журналу должно дать те же строки, что и полный запуск'
+    )
+    assert not set(done) & set(fetched), (
+        'URL из журнала не должны загружаться повторно'
+    )
+    assert not journal_path.exists()
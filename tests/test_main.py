@@ -1,4 +1,8 @@
+import os
 import pytest
+import signal
+from argparse import Namespace
+from collections import Counter
 from pathlib import Path
 try:
     from src import main
@@ -140,3 +144,159 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+@pytest.mark.parametrize('pep_source', ['api', 'pages'])
+def test_pep_on_corpus(monkeypatch, tmp_path, corpus_session, pep_source):
+    from benchmarks.corpus import pep_rows
+    monkeypatch.setattr(main, 'PEP_INDEX_FILE', tmp_path / 'pep_index.json')
+    got = main.pep(corpus_session, Namespace(
+        workers=4, incremental=False, pep_source=pep_source
+    ))
+    assert got[0] == ('Статус', 'Количество')
+    assert got[-1] == ('Всего', len(pep_rows())), (
+        'Функция `pep` должна посчитать все PEP из таблиц по категориям'
+    )
+    assert dict(got[1:-1]) == Counter(status for *_, status in pep_rows())
+
+
+def test_modes_on_corpus(corpus_session):
+    got = main.whats_new(corpus_session, Namespace(workers=4))
+    assert got[1][0] == 'https://docs.python.org/3/whatsnew/3.13.html'
+    assert got[1][1] == 'What’s New In Python 3.13¶'
+    assert 'Adam Turner' in got[1][2]
+    assert ('https://docs.python.org/3.12/', '3.12', 'security-fixes') in (
+        main.latest_versions(corpus_session)
+    )
+
+
+def test_parse_pool_matches_inline_parsing(corpus_session):
+    got = {
+        parse_workers: main.whats_new(corpus_session, Namespace(
+            workers=4, parse_workers=parse_workers
+        ))
+        for parse_workers in (2, 0)
+    }
+    assert got[2] == got[0], (
+        'Разбор в пуле процессов должен давать те же строки, что и в потоках'
+    )
+
+
+def test_parse_pool_keeps_profile_phases(monkeypatch, corpus_session):
+    from profiling import profiler
+    monkeypatch.setattr(profiler, 'enabled', True)
+    monkeypatch.setattr(profiler, 'samples', type(profiler.samples)(list))
+    main.whats_new(corpus_session, Namespace(workers=4, parse_workers=2))
+    assert {'parse', 'find_tag', 'parse_pool'} <= set(profiler.samples), (
+        'Замеры разбора в пуле процессов должны попадать в профиль'
+    )
+    assert all(url for _, url in profiler.samples['parse']), (
+        'Замеры из пула должны относиться к URL страницы'
+    )
+
+
+def test_parse_pool_skips_one_off_pages(corpus_session):
+    with main.page_parser(Namespace(parse_workers=2)) as parser:
+        main.get_record(
+            corpus_session, parser, 'versions', main.MAIN_DOC_URL
+        )
+    assert parser.executor is None, (
+        'Одиночные страницы должны разбираться без запуска пула процессов'
+    )
+
+
+def test_pep_reuses_memoized_statuses(monkeypatch, tmp_path, corpus_session):
+    import parsing
+    monkeypatch.setattr(main, 'PEP_INDEX_FILE', tmp_path / 'pep_index.json')
+    cli_args = Namespace(
+        workers=4, parse_workers=0, incremental=False, pep_source='pages'
+    )
+    first = main.pep(corpus_session, cli_args)
+
+    def parse_again(*args, **kwargs):
+        raise AssertionError('Неизменившаяся страница разобрана повторно')
+
+    monkeypatch.setattr(parsing, 'extract_record', parse_again)
+    assert main.pep(corpus_session, cli_args) == first, (
+        'Повторный запуск должен брать статусы из сохранённых результатов'
+    )
+
+
+def test_run_modes_shares_session(capsys, corpus_session):
+    sent = []
+    corpus_session.hooks['response'].append(
+        lambda response, *args, **kwargs: sent.append(response.url)
+    )
+    cli_args = Namespace(workers=4, parse_workers=0, output=None)
+    main.run_modes(
+        corpus_session, cli_args,
+        main.selected_modes(['latest-versions', 'whats-new'])
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert lines.index('Ссылка на документацию Версия Статус') < lines.index(
+        'Ссылка на статью Заголовок Редактор, Автор'
+    ), 'Вывод режимов должен идти в порядке их перечисления'
+    assert 'https://docs.python.org/3/whatsnew/3.13.html' in sent
+    assert main.selected_modes(['pep', 'all']) == list(main.MODE_TO_ROWS)
+
+
+@pytest.mark.parametrize('pep_source', ['api', 'pages'])
+def test_pep_shards_merge_to_single_run(
+        monkeypatch, tmp_path, caplog, corpus_session, pep_source
+):
+    import outputs
+    monkeypatch.setattr(main, 'PEP_INDEX_FILE', tmp_path / 'pep_index.json')
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    cli_args = Namespace(
+        workers=4, parse_workers=0, incremental=False, pep_source=pep_source
+    )
+    single = main.pep(corpus_session, cli_args)
+    single_errors = [record.message for record in caplog.records]
+    shard_totals = 0
+    for index in range(1, 4):
+        cli_args.shard = (index, 3)
+        shard_totals += main.pep(corpus_session, cli_args)[-1][1]
+    assert shard_totals == single[-1][1], (
+        'Части `--shard` должны вместе покрыть все PEP ровно один раз'
+    )
+    caplog.clear()
+    merged = list(main.iter_merged_pep(
+        sorted((tmp_path / 'results').glob('pep_shard_*_of_3.json'))
+    ))
+    assert merged == single, (
+        'Сведённые части должны давать ту же таблицу, что и один обход'
+    )
+    assert [record.message for record in caplog.records] == single_errors
+
+
+def test_merge_rejects_incomplete_shards(tmp_path):
+    from shards import PepTally, merge_shards
+    from exceptions import ShardError
+    paths = []
+    for index in (1, 3):
+        paths.append(tmp_path / f'pep_shard_{index}_of_3.json')
+        PepTally().save(paths[-1], (index, 3), [])
+    with pytest.raises(ShardError):
+        merge_shards(paths)
+
+
+def test_sigterm_flushes_log_queue(monkeypatch):
+    stopped = []
+
+    class Listener:
+        def stop(self):
+            stopped.append(True)
+
+    def run(arg_parser, args):
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    monkeypatch.setattr('sys.argv', ['main.py', 'pep'])
+    monkeypatch.setattr(main, 'configure_logging', lambda *args: Listener())
+    monkeypatch.setattr(main, 'run', run)
+    handler = signal.getsignal(signal.SIGTERM)
+    with pytest.raises(SystemExit):
+        main.main()
+    assert stopped, (
+        'По SIGTERM очередь лога должна сбрасываться до выхода из процесса'
+    )
+    assert signal.getsignal(signal.SIGTERM) == handler
@@ -0,0 +1,37 @@
+try:
+    from src import memo
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memo.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memo.py`'
+
+
+def test_memo_invalidates_only_changed_extractor(tmp_path):
+    path = tmp_path / 'memo.sqlite'
+    calls = []
+
+    def extract(record):
+        calls.append(record)
+        return record
+
+    versions = {'title': 1, 'status': 1}
+    with memo.ExtractionMemo(path, versions) as saved:
+        assert saved.extract('title', b'page', lambda: extract(['T'])) == [
+            'T'
+        ]
+        saved.extract('status', b'page', lambda: extract('Active'))
+        saved.extract('status', b'page', lambda: extract('Draft'))
+    assert calls == [['T'], 'Active'], (
+        'Для того же тела страницы извлечение не должно повторяться'
+    )
+
+    with memo.ExtractionMemo(path, {'title': 2, 'status': 1}) as saved:
+        assert saved.extract('status', b'page', lambda: extract('')) == (
+            'Active'
+        )
+        assert saved.extract('title', b'page', lambda: extract(['T2'])) == [
+            'T2'
+        ], 'Смена версии извлекателя должна сбрасывать его записи'
+        assert saved.extract('title', b'other', lambda: extract(['X'])) == [
+            'X'
+        ]
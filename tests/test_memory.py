@@ -0,0 +1,21 @@
+import argparse
+
+import pytest
+
+try:
+    from benchmarks import memory
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что есть файл `benchmarks/memory.py`'
+except ImportError:
+    assert False, 'Убедитесь что есть файл `benchmarks/memory.py`'
+
+
+@pytest.mark.parametrize('count', [100, 1000])
+def test_pep_crawl_memory_does_not_grow_with_peps(count):
+    args = argparse.Namespace(padding=256 * 1024, workers=8)
+    result = memory.run_child(count, args)
+    assert result['total'] == count, 'Обход должен учесть все PEP индекса'
+    assert result['growth_mb'] <= memory.CEILING_MB, (
+        'Пиковый RSS обхода pep не должен расти с числом PEP: '
+        f'прирост {result["growth_mb"]:.1f} МБ для {count} PEP'
+    )
@@ -1,3 +1,5 @@
+import json
+import sqlite3
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +92,137 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_streams_partial_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+
+    def rows():
+        yield 'Статус', 'Количество'
+        yield 'Active', 36
+        raise RuntimeError('crawl interrupted')
+
+    with pytest.raises(RuntimeError):
+        outputs.control_output(rows(), cli_args('pep', 'file'))
+    output_file, = (Path(tmp_path) / 'results').glob('*.csv')
+    assert output_file.read_text(encoding='utf-8').splitlines() == [
+        '"Статус","Количество"', '"Active","36"'
+    ], 'Файл должен содержать строки, полученные до сбоя'
+
+
+@pytest.mark.parametrize('output_format', [None, 'pretty'])
+def test_control_output_accepts_iterator(capsys, records, output_format):
+    outputs.control_output(
+        iter(records('pep')), cli_args('pep', output_format)
+    )
+    captured_out, _ = capsys.readouterr()
+    assert 'Active' in captured_out
+
+
+def test_jsonl_output_appends_runs(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    for _ in range(2):
+        outputs.control_output(records('pep'), cli_args('pep', 'jsonl'))
+    lines = (Path(tmp_path) / 'results' / 'pep.jsonl').read_text(
+        encoding='utf-8'
+    ).splitlines()
+    rows = records('pep')[1:]
+    assert len(lines) == 2 * len(rows), (
+        'Каждый запуск должен дописывать строки в results/<режим>.jsonl'
+    )
+    first = json.loads(lines[0])
+    assert first['mode'] == 'pep'
+    assert (first['status'], first['count']) == tuple(rows[0])
+
+
+def test_sqlite_output_keeps_pep_runs_apart(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(outputs, 'INSERT_BATCH', 2)
+    rows = [('Статус', 'Количество'), ('Active', 36), ('Final', 300),
+            ('Draft', 30), ('Всего', 366)]
+    outputs.control_output(rows, cli_args('pep', 'sqlite'))
+    outputs.control_output(
+        rows[:1] + [('Active', 37), ('Всего', 37)],
+        cli_args('pep', 'sqlite')
+    )
+    connection = sqlite3.connect(
+        str(Path(tmp_path) / 'results' / 'results.sqlite')
+    )
+    runs = connection.execute(
+        'SELECT run_at, rows, total FROM runs ORDER BY run_at'
+    ).fetchall()
+    assert [(count, total) for _, count, total in runs] == [
+        (3, 366), (1, 37)
+    ], 'Каждый запуск должен храниться отдельно со своим итогом'
+    for run_at, count, _ in runs:
+        assert connection.execute(
+            'SELECT COUNT(*) FROM pep_statuses WHERE run_at = ?', (run_at,)
+        ).fetchone() == (count,), 'Строк запуска должно быть runs.rows'
+    assert not connection.execute(
+        "SELECT * FROM pep_statuses WHERE status = 'Всего'"
+    ).fetchall(), 'Итог не должен храниться как статус PEP'
+    got = dict(connection.execute(
+        'SELECT status, count FROM pep_latest_statuses'
+    ))
+    assert got == {'Active': 37}, (
+        'Таблица последних статусов должна совпадать с последним запуском'
+    )
+    connection.close()
+
+
+def test_sqlite_output_rolls_back_failed_run(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(outputs, 'INSERT_BATCH', 2)
+
+    def rows():
+        yield from records('whats-new')
+        raise RuntimeError('crawl interrupted')
+
+    with pytest.raises(RuntimeError):
+        outputs.control_output(rows(), cli_args('whats-new', 'sqlite'))
+    connection = sqlite3.connect(
+        str(Path(tmp_path) / 'results' / 'results.sqlite')
+    )
+    assert connection.execute(
+        'SELECT COUNT(*) FROM whats_new'
+    ).fetchone() == (0,), 'Прерванный запуск не должен оставлять строк'
+    connection.close()
+
+
+def test_pretty_output_truncates_long_cells(capsys):
+    rows = [
+        ('Ссылка', 'Заголовок', 'Редактор'),
+        ('3.9.html', 'What’s New In Python 3.9', 'Łukasz Langa ' * 20),
+        ('3.8.html', 'What’s New In Python 3.8', 'Raymond Hettinger'),
+    ]
+    outputs.pretty_output(rows, Namespace(column_width=20))
+    lines = capsys.readouterr().out.splitlines()
+    assert len({len(line) for line in lines}) == 1, (
+        'Все строки таблицы `pretty` должны быть одной ширины'
+    )
+    assert 'Łukasz Langa Łukasz…' in lines[3], (
+        'Ячейки длиннее --column-width должны обрезаться с многоточием'
+    )
+    assert lines[0] == lines[2] == lines[-1] == (
+        '+----------+----------------------+----------------------+'
+    )
+
+
+def test_pretty_output_prints_pages_before_last_row(
+        monkeypatch, capsys
+):
+    monkeypatch.setattr(outputs, 'SAMPLE_ROWS', 2)
+    monkeypatch.setattr(outputs, 'PAGE_ROWS', 5)
+
+    def rows():
+        yield 'Статус', 'Количество'
+        for number in range(10):
+            yield f'Status {number}', number
+        raise RuntimeError('crawl interrupted')
+
+    with pytest.raises(RuntimeError):
+        outputs.pretty_output(rows())
+    captured_out = capsys.readouterr().out
+    assert 'Status 6' in captured_out, (
+        'Вывод `pretty` должен печатать строки страницами по мере поступления'
+    )
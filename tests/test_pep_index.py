@@ -0,0 +1,118 @@
+from argparse import Namespace
+from string import Template
+
+import pytest
+import requests_mock
+
+try:
+    from src import configs, main, pep_index
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep_index.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep_index.py`'
+
+
+def test_pep_index_roundtrip(tmp_path):
+    path = tmp_path / 'pep_index.json'
+    index = pep_index.PepIndex(path)
+    assert index.get('8') is None
+    index.update(
+        '8', row='PA', status='Active', etag='"v1"', last_modified=None
+    )
+    index.save()
+    got = pep_index.PepIndex(path).get('8')
+    assert got['status'] == 'Active' and got['row'] == 'PA', (
+        'Индекс PEP должен сохраняться между запусками'
+    )
+
+
+PEP_8 = 'https://peps.python.org/pep-0008/'
+
+
+def pep_page(status):
+    from benchmarks.corpus import read_page
+
+    return Template(read_page('peps', 'pep.html')).substitute(
+        number=8, padded='0008', title='PEP 8', authors='Guido van Rossum',
+        status=status, type='Process'
+    )
+
+
+@pytest.fixture
+def pep_8_session():
+    """Сессия с кешем и сроками жизни, как при запуске парсера."""
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'GET', PEP_8, text=pep_page('Final'), headers={'ETag': '"v2"'}
+    )
+    adapter.register_uri(
+        'GET', PEP_8, request_headers={'If-None-Match': '"v1"'},
+        status_code=304
+    )
+    session = configs.configure_session(Namespace(cache_backend='memory'))
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+def pep_8_status(session, index, row):
+    with main.page_parser(Namespace(parse_workers=0)) as parser:
+        return main.get_pep_status(
+            session, index, parser, True, ('8', PEP_8, row)
+        )
+
+
+@pytest.mark.parametrize('row, expected_status, conditional', [
+    ('PA', 'Active', True),
+    ('PF', 'Final', False),
+])
+def test_incremental_pep_status(
+        tmp_path, pep_8_session, row, expected_status, conditional
+):
+    session, adapter = pep_8_session
+    index = pep_index.PepIndex(tmp_path / 'pep_index.json')
+    index.update(
+        '8', row='PA', status='Active', etag='"v1"', last_modified=None
+    )
+    assert pep_8_status(session, index, row) == expected_status, (
+        'При --incremental ответ 304 должен возвращать статус из индекса, '
+        'а изменившаяся строка индекса — приводить к разбору страницы'
+    )
+    assert (
+        'If-None-Match' in adapter.last_request.headers
+    ) is conditional, (
+        'Условный запрос нужен только для неизменившейся строки индекса'
+    )
+    assert index.get('8')['row'] == row
+
+
+def test_changed_row_bypasses_cache(tmp_path, pep_8_session):
+    session, adapter = pep_8_session
+    adapter.register_uri(
+        'GET', PEP_8, text=pep_page('Draft'), headers={'ETag': '"v3"'}
+    )
+    index = pep_index.PepIndex(tmp_path / 'pep_index.json')
+    assert pep_8_status(session, index, 'PD') == 'Draft'
+    adapter.register_uri(
+        'GET', PEP_8, text=pep_page('Final'), headers={'ETag': '"v4"'}
+    )
+    assert pep_8_status(session, index, 'PF') == 'Final', (
+        'Изменившаяся строка индекса должна загружать страницу мимо кеша'
+    )
+    assert adapter.call_count == 2
+    assert index.get('8') == {
+        'row': 'PF', 'status': 'Final', 'etag': '"v4"', 'last_modified': None
+    }
+
+
+def test_unchanged_row_revalidates_cached_page(tmp_path, pep_8_session):
+    session, adapter = pep_8_session
+    index = pep_index.PepIndex(tmp_path / 'pep_index.json')
+    assert pep_8_status(session, index, 'PF') == 'Final'
+    adapter.register_uri(
+        'GET', PEP_8, text=pep_page('Superseded'), headers={'ETag': '"v3"'}
+    )
+    assert pep_8_status(session, index, 'PF') == 'Superseded', (
+        'Неизменившаяся строка индекса должна перепроверяться на сервере, '
+        'а не браться из кеша'
+    )
+    assert adapter.last_request.headers['If-None-Match'] == '"v2"'
@@ -0,0 +1,49 @@
+import time
+
+try:
+    from src import profiling
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiling.py`'
+
+
+def test_profiler_disabled_records_nothing():
+    profiler = profiling.Profiler()
+    with profiler.timed('fetch', 'https://peps.python.org/'):
+        pass
+    assert not profiler.samples
+
+
+def test_profiler_report():
+    profiler = profiling.Profiler()
+    profiler.enabled = True
+    for url in ('https://peps.python.org/pep-0008/',
+                'https://peps.python.org/pep-0020/'):
+        profiler.set_url(url)
+        with profiler.timed('fetch') as sample:
+            sample.phase = 'cache'
+        with profiler.timed('parse'):
+            time.sleep(0.01 if url.endswith('0020/') else 0)
+    report = profiler.report()
+    assert set(report['phases']) == {'cache', 'parse'}
+    assert report['phases']['parse']['count'] == 2
+    assert report['phases']['parse']['max_ms'] >= 10
+    assert report['slowest_urls'][0]['url'] == (
+        'https://peps.python.org/pep-0020/'
+    ), 'Самые медленные URL должны идти первыми'
+
+
+def test_timed_output_excludes_row_production():
+    profiler = profiling.Profiler()
+    profiler.enabled = True
+
+    def rows():
+        time.sleep(0.05)
+        yield 'Статус', 'Количество'
+
+    profiler.timed_output(lambda results, *args: list(results), rows())
+    output_seconds, _ = profiler.samples['output'][0]
+    assert output_seconds < 0.05, (
+        'Время вывода не должно включать получение строк'
+    )
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+import time
+
+import pytest
+import requests
+
+try:
+    from src import adapters, ratelimit
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `ratelimit.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `ratelimit.py`'
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Отвечает 429, если одновременных запросов больше capacity."""
+
+    capacity = 3
+    lock = Lock()
+    active = 0
+    peak = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            status = 429 if cls.active > cls.capacity else 200
+        time.sleep(0.02)
+        with cls.lock:
+            cls.active -= 1
+        self.send_response(status)
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def throttling_server():
+    ThrottlingHandler.active = ThrottlingHandler.peak = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def test_limit_grows_while_latency_is_stable():
+    limiter = ratelimit.HostLimiter(6, initial=1)
+    for _ in range(40):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 6, (
+        'Окно должно расти до максимума, пока задержка стабильна'
+    )
+
+
+def test_throttling_halves_limit_once_per_epoch():
+    limiter = ratelimit.HostLimiter(8, initial=8)
+    first = limiter.acquire()
+    second = limiter.acquire()
+    limiter.release(first, throttled=True)
+    limiter.release(second, throttled=True)
+    assert limiter.limit == 4, (
+        'Ответы 429/503 от запросов одного поколения должны '
+        'уменьшать окно вдвое только один раз'
+    )
+    limiter.release(limiter.acquire(), throttled=True)
+    assert limiter.limit == 2
+
+
+def test_rising_latency_shrinks_limit():
+    limiter = ratelimit.HostLimiter(8, initial=8)
+    for _ in range(5):
+        limiter.release(limiter.acquire())
+    started = limiter.acquire()
+    limiter.release(started - 1)
+    assert limiter.limit < 8, (
+        'Рост задержки над базовой должен уменьшать окно'
+    )
+
+
+def test_max_rps_ceiling():
+    limiter = ratelimit.HostLimiter(10, max_rps=50, initial=10)
+    started = time.monotonic()
+    for _ in range(11):
+        limiter.release(limiter.acquire())
+    assert time.monotonic() - started >= 10 / 50, (
+        'Запросы к хосту не должны превышать max_rps в секунду'
+    )
+
+
+def test_controller_keeps_limiter_per_host():
+    controller = ratelimit.RateController(4, 10)
+    assert controller.limiter('a') is controller.limiter('a')
+    assert controller.limiter('a') is not controller.limiter('b')
+
+
+def test_adapter_backs_off_throttling_server(throttling_server):
+    adapters.http_stats.clear()
+    host, port = throttling_server
+    adapter = adapters.build_adapter(8, 5, 10)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    url = f'http://{host}:{port}/'
+    with ThreadPoolExecutor(8) as executor:
+        statuses = list(executor.map(
+            lambda _: session.get(url).status_code, range(60)
+        ))
+    limiter = adapter.rate_controller.limiter(f'{host}:{port}')
+    assert statuses == [200] * 60, (
+        'Все запросы должны завершиться успешно после повторов'
+    )
+    assert ThrottlingHandler.peak <= 8
+    assert adapters.http_stats['throttled'] > 0
+    assert limiter.limit < 8, (
+        'После ответов 429 окно параллельных запросов должно сократиться'
+    )
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+HEAVY_MODULES = (
+    'bs4', 'lxml', 'requests', 'requests_cache', 'tqdm', 'urllib3',
+)
+# Бюджет на импорт main.py с запасом для медленных машин CI.
+IMPORT_BUDGET_US = 150_000
+
+
+def import_times(*args):
+    """Модули, загруженные при запуске, и их кумулятивное время (мкс)."""
+    completed = subprocess.run(
+        (sys.executable, '-X', 'importtime', *args),
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return completed, times
+
+
+@pytest.mark.parametrize('args', [
+    ('-c', 'import main'),
+    ('main.py', '--help'),
+    ('main.py', 'unknown-mode'),
+])
+def test_startup_skips_heavy_modules(args):
+    _, times = import_times(*args)
+    loaded = sorted(
+        name for name in times if name.split('.')[0] in HEAVY_MODULES
+    )
+    assert not loaded, (
+        f'При запуске {" ".join(args)} не должны загружаться: {loaded}'
+    )
+
+
+def test_main_import_budget():
+    completed, times = import_times('-c', 'import main')
+    assert completed.returncode == 0, completed.stderr
+    assert times['main'] < IMPORT_BUDGET_US, (
+        f'Импорт main.py занял {times["main"]} мкс,'
+        f' бюджет {IMPORT_BUDGET_US} мкс'
+    )
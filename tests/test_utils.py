@@ -54,3 +54,114 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_fetch_concurrently_keeps_order_and_errors():
+    def fetch(item):
+        if item == 3:
+            raise ConnectionError('boom')
+        return item * 10
+
+    got = list(utils.fetch_concurrently(fetch, range(6), workers=3))
+    assert [result for result, _ in got] == [0, 10, 20, None, 40, 50], (
+        'Функция `fetch_concurrently` должна сохранять порядок элементов'
+    )
+    assert isinstance(got[3][1], ConnectionError), (
+        'Функция `fetch_concurrently` должна возвращать ошибку загрузки'
+    )
+
+
+def test_get_soup_parse_only(mock_session):
+    page = (
+        '<html><body><nav><dl><dt>Menu</dt></dl></nav>'
+        '<section id="pep-content"><h1>PEP 8</h1><dl>'
+        '<dt>Status<span>:</span></dt><dd><abbr>Active</abbr></dd>'
+        '</dl></section><footer><h1>Footer</h1></footer></body></html>'
+    )
+    strainer = bs4.SoupStrainer('section', {'id': 'pep-content'})
+    with requests_mock.Mocker() as mock:
+        mock.get(MAIN_DOC_URL + 'pep/', text=page)
+        full = utils.get_soup(mock_session, MAIN_DOC_URL + 'pep/')
+        partial = utils.get_soup(
+            mock_session, MAIN_DOC_URL + 'pep/', parse_only=strainer
+        )
+    for tag in ('h1', 'dl', 'dd'):
+        assert (
+            utils.find_tag(full.find(id='pep-content'), tag).text
+            == utils.find_tag(partial, tag).text
+        ), (
+            'Функция `get_soup` с `parse_only` должна строить то же '
+            'поддерево, что и полный разбор страницы'
+        )
+    assert partial.find('nav') is None
+
+
+def test_download_file_resumes_and_skips(mock_session, tmp_path):
+    data = bytes(range(256)) * 100
+    url = MAIN_DOC_URL + 'archives/docs.zip'
+    target = tmp_path / 'docs.zip'
+    (tmp_path / 'docs.zip.part').write_bytes(data[:1000])
+    (tmp_path / 'docs.zip.etag').write_text('"v1"')
+
+    def archive(request, context):
+        if request.headers.get('If-Range') == '"v1"':
+            context.status_code = 206
+            return data[int(request.headers['Range'][6:-1]):]
+        return data
+
+    with requests_mock.Mocker() as mock:
+        mock.head(url, headers={
+            'ETag': '"v1"', 'Content-Length': str(len(data))
+        })
+        mock.get(url, content=archive)
+        utils.download_file(mock_session, url, target)
+        assert target.read_bytes() == data, (
+            'Функция `download_file` должна дозагружать частичный файл'
+        )
+        assert not (tmp_path / 'docs.zip.part').exists()
+        requests_count = mock.call_count
+        utils.download_file(mock_session, url, target)
+        assert mock.call_count == requests_count + 1, (
+            'Функция `download_file` не должна скачивать неизменённый файл'
+        )
+
+        mock.head(url, headers={
+            'ETag': '"v2"', 'Content-Length': str(len(data))
+        })
+        mock.get(url, status_code=404, content=b'Not Found')
+        with pytest.raises(requests.HTTPError):
+            utils.download_file(mock_session, url, target)
+        assert target.read_bytes() == data, (
+            'Ответ с ошибкой не должен заменять уже скачанный файл'
+        )
+
+        target.unlink()
+        (tmp_path / 'docs.zip.part').write_bytes(data)
+        (tmp_path / 'docs.zip.etag').write_text('"v1"')
+        mock.head(url, headers={
+            'ETag': '"v1"', 'Content-Length': str(len(data))
+        })
+        mock.get(url, status_code=416, content=b'Range Not Satisfiable')
+        utils.download_file(mock_session, url, target)
+        assert target.read_bytes() == data, (
+            'Целиком скачанный частичный файл должен переименовываться '
+            'при ответе 416'
+        )
+
+        target.unlink()
+        (tmp_path / 'docs.zip.part').write_bytes(data + b'extra')
+        mock.head(url, headers={'ETag': '"v1"'})
+
+        def unsatisfiable(request, context):
+            if 'Range' in request.headers:
+                context.status_code = 416
+                return b'Range Not Satisfiable'
+            return data
+
+        mock.get(url, content=unsatisfiable)
+        utils.download_file(mock_session, url, target)
+        assert target.read_bytes() == data, (
+            'При ответе 416 на неподтверждённый частичный файл он должен '
+            'загружаться заново целиком'
+        )
+        assert not (tmp_path / 'docs.zip.part').exists()
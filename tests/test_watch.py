@@ -0,0 +1,47 @@
+import os
+import signal
+import time
+from threading import Timer
+
+try:
+    from src import watch
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `watch.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `watch.py`'
+
+
+def test_watcher_emits_only_changes():
+    results = iter([[('3.13', 'stable')], [('3.13', 'stable')],
+                    [('3.14', 'pre-release')]])
+    emitted = []
+
+    def run(mode):
+        rows = next(results, None)
+        if rows is None:
+            watcher.stop()
+        return rows
+
+    watcher = watch.Watcher(
+        run, lambda mode, rows: emitted.append(rows),
+        {'latest-versions': 0.01}
+    )
+    watcher.watch(['latest-versions'])
+    assert emitted == [[('3.13', 'stable')], [('3.14', 'pre-release')]], (
+        'Результаты должны выводиться только при изменении'
+    )
+
+
+def test_watcher_stops_on_sigterm():
+    runs = []
+    watcher = watch.Watcher(
+        lambda mode: runs.append(mode), lambda mode, rows: None, {'pep': 60}
+    )
+    Timer(0.2, os.kill, (os.getpid(), signal.SIGTERM)).start()
+    started = time.monotonic()
+    watcher.watch(['pep'])
+    assert time.monotonic() - started < 5, (
+        'По SIGTERM наблюдение должно завершаться, не дожидаясь интервала'
+    )
+    assert runs == ['pep']
+    assert signal.getsignal(signal.SIGTERM) != watcher.stop